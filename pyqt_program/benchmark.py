@@ -0,0 +1,68 @@
+# benchmark.py
+import sys
+import time
+import tracemalloc
+
+from book_library import Book, EBook, Library
+
+
+def make_library(n):
+    library = Library()
+    for i in range(n):
+        library.add_book(Book(f"Title {i}", f"Author {i % 1000}", str(i)))
+    return library
+
+
+def bench_isbn_ops(sizes=(1_000, 10_000, 100_000, 1_000_000), rounds=10_000):
+    print("ISBN-keyed operations (lend + return of a book at the end of the catalog)")
+    for n in sizes:
+        library = make_library(n)
+        isbn = str(n - 1)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            library.lend_book(isbn)
+            library.return_book(isbn)
+        elapsed = time.perf_counter() - start
+        print(f"  {n:>9} books: {elapsed / rounds * 1e6:8.2f} us per lend+return")
+
+
+# Dict-backed equivalents of Book/EBook, kept only as the memory baseline
+class DictBook:
+    def __init__(self, title, author, isbn):
+        self.title = title
+        self.author = author
+        self.isbn = isbn
+        self.is_lent = False
+
+
+class DictEBook(DictBook):
+    def __init__(self, title, author, isbn, download_size):
+        super().__init__(title, author, isbn)
+        self.download_size = download_size
+
+
+def bytes_per_book(book_cls, ebook_cls, n):
+    # Strings are created up front so only the record objects are measured
+    rows = [(f"Title {i}", f"Author {i % 1000}", str(i)) for i in range(n)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    books = [ebook_cls(*row, 1.5) if i % 2 else book_cls(*row) for i, row in enumerate(rows)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before - sys.getsizeof(books)) / len(books)
+
+
+def bench_memory(n=200_000):
+    print(f"Memory per record ({n} books, half of them eBooks)")
+    print(f"  dict-backed: {bytes_per_book(DictBook, DictEBook, n):6.1f} bytes")
+    print(f"  __slots__:   {bytes_per_book(Book, EBook, n):6.1f} bytes")
+
+
+BENCHMARKS = {
+    "isbn": bench_isbn_ops,
+    "memory": bench_memory,
+}
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
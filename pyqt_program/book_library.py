@@ -1,11 +1,27 @@
 # book_library.py
 
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import chain
+import math
+import re
+
 # Custom exception for unavailable book lending
 class BookNotAvailableError(Exception):
     pass
 
+# Author and title lookups ignore case and extra whitespace
+def _normalize(text):
+    return " ".join(text.casefold().split())
+
+# Words used by the full-text index
+def _tokens(text):
+    return re.findall(r"\w+", text.casefold())
+
 # Book class with basic attributes
 class Book:
+    __slots__ = ("title", "author", "isbn", "is_lent")  # no per-instance __dict__
+
     def __init__(self, title, author, isbn):
         self.title = title
         self.author = author
@@ -15,41 +31,219 @@ class Book:
     def __str__(self):
         return f"{self.title} by {self.author} (ISBN: {self.isbn})"
 
+# Character trigrams of each word, padded, used for fuzzy author matching
+def _trigrams(text):
+    return {f"  {word} "[i:i + 3] for word in _tokens(text) for i in range(len(word) + 1)}
+
+# Title words count double so title matches rank above author matches
+def _token_weights(book):
+    weights = {}
+    for token in _tokens(book.title):
+        weights[token] = weights.get(token, 0) + 2
+    for token in _tokens(book.author):
+        weights[token] = weights.get(token, 0) + 1
+    return weights
+
 # Library class to manage books
 class Library:
     def __init__(self):
-        self.books = []  # Store all books
+        self._books = {}  # ISBN -> list of copies sharing that ISBN
+        self._by_author = {}  # normalized author -> list of books
+        self._available = {}  # available books, used as an ordered set
+        self._lent = {}  # lent books, used as an ordered set
+        self._title_keys = []  # sorted normalized titles, for prefix search
+        self._title_books = []  # books, parallel to _title_keys
+        self._author_trigrams = {}  # trigram -> set of normalized authors
+        self._trigram_counts = {}  # normalized author -> number of trigrams
+        self._postings = {}  # token -> {book: weight}
+        self._listeners = []  # called as listener(event, book) after each change
+
+    @property
+    def books(self):
+        return [book for copies in self._books.values() for book in copies]
+
+    def __len__(self):
+        return len(self._available) + len(self._lent)
+
+    def __contains__(self, isbn):
+        return isbn in self._books
+
+    # Live views over each partition; len() is O(1)
+    def available(self):
+        return self._available.keys()
+
+    def lent(self):
+        return self._lent.keys()
+
+    # Change events: "added", "removed", "lent" and "returned", one per book
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def _emit(self, event, book):
+        for listener in self._listeners:
+            listener(event, book)
 
     def add_book(self, book):
-        self.books.append(book)
+        self._books.setdefault(book.isbn, []).append(book)
+        self._index(book)
+        self._emit("added", book)
 
     def remove_book(self, isbn):
-        self.books = [book for book in self.books if book.isbn != isbn]
+        for book in self._books.pop(isbn, ()):
+            self._unindex(book)
+            self._emit("removed", book)
+
+    # Keep the secondary indexes in step with the ISBN table
+    def _index(self, book):
+        key = _normalize(book.author)
+        same_author = self._by_author.get(key)
+        if same_author is None:
+            same_author = self._by_author[key] = []
+            trigrams = _trigrams(key)
+            self._trigram_counts[key] = len(trigrams)
+            for trigram in trigrams:
+                self._author_trigrams.setdefault(trigram, set()).add(key)
+        same_author.append(book)
+        (self._lent if book.is_lent else self._available)[book] = None
+        key = _normalize(book.title)
+        i = bisect_right(self._title_keys, key)
+        self._title_keys.insert(i, key)
+        self._title_books.insert(i, book)
+        for token, weight in _token_weights(book).items():
+            self._postings.setdefault(token, {})[book] = weight
+
+    def _unindex(self, book):
+        (self._lent if book.is_lent else self._available).pop(book)
+        key = _normalize(book.author)
+        same_author = self._by_author[key]
+        same_author.remove(book)
+        if not same_author:
+            del self._by_author[key]
+            del self._trigram_counts[key]
+            for trigram in _trigrams(key):
+                authors = self._author_trigrams[trigram]
+                authors.discard(key)
+                if not authors:
+                    del self._author_trigrams[trigram]
+        key = _normalize(book.title)
+        i = bisect_left(self._title_keys, key)
+        while self._title_books[i] is not book:
+            i += 1
+        del self._title_keys[i]
+        del self._title_books[i]
+        for token in _token_weights(book):
+            posting = self._postings[token]
+            del posting[book]
+            if not posting:
+                del self._postings[token]
 
     def lend_book(self, isbn):
-        for book in self.books:
-            if book.isbn == isbn and not book.is_lent:
+        for book in self._books.get(isbn, ()):
+            if not book.is_lent:
+                del self._available[book]
+                self._lent[book] = None
                 book.is_lent = True
+                self._emit("lent", book)
                 return book
         raise BookNotAvailableError("Book is either not available or already lent.")
 
     def return_book(self, isbn):
-        for book in self.books:
-            if book.isbn == isbn and book.is_lent:
+        for book in self._books.get(isbn, ()):
+            if book.is_lent:
+                del self._lent[book]
+                self._available[book] = None
                 book.is_lent = False
+                self._emit("returned", book)
                 return
         raise BookNotAvailableError("This book was not lent out.")
 
     def __iter__(self):
         # Custom iterator to yield only available books
-        return (book for book in self.books if not book.is_lent)
+        return iter(list(self._available))
 
     def books_by_author(self, author):
-        # Generator function to yield books by specific author
-        return (book for book in self.books if book.author.lower() == author.lower())
+        # Yield books by a specific author straight from the author index
+        return iter(list(self._by_author.get(_normalize(author), ())))
+
+    def similar_authors(self, name, limit=5, threshold=0.4):
+        # Author names containing most of name's trigrams, closest first
+        query = _trigrams(name)
+        if not query:
+            return []
+        need = max(1, math.ceil(threshold * len(query)))
+        # Posting sets rarest first. An author sharing at least `level` of the
+        # query's trigrams is in one of the rarest len(query) - level + 1
+        # sets, so levels are tried from the top, taking in one more set
+        # each time, until `limit` authors reach the level; everyone not
+        # counted by then ranks below them
+        postings = sorted((self._author_trigrams.get(trigram, frozenset()) for trigram in query), key=len)
+        n = len(postings)
+        counts = {}  # normalized author -> trigrams shared with the query
+        reaching = Counter()  # trigrams shared -> number of authors
+        seen = set()
+        partial = frozenset()  # authors from the last level's set that missed some set
+        for level in range(n, need - 1, -1):
+            if partial:
+                # Below their first level these can qualify too: count them
+                found = Counter(chain.from_iterable(partial & posting for posting in postings[n - level - 1:]))
+                counts.update(found)
+                reaching.update(found.values())
+            # Authors the new set brings are in none of the rarer sets, so
+            # only those in every remaining set reach this level
+            new = postings[n - level] - seen
+            seen |= new
+            full = new.intersection(*postings[n - level + 1:])
+            counts.update(dict.fromkeys(full, level))
+            reaching[level] += len(full)
+            partial = new - full
+            if sum(authors for common, authors in reaching.items() if common >= level) >= limit:
+                break
+        matches = []
+        for key, common in counts.items():
+            if common >= level:
+                # Ties on query coverage go to the author with fewer extra trigrams
+                matches.append((-common, self._trigram_counts[key], key))
+        matches.sort()
+        return [self._by_author[key][0].author for common, size, key in matches[:limit]]
+
+    def titles_starting_with(self, prefix, limit=10):
+        # Up to `limit` books whose title starts with prefix, in title order
+        prefix = _normalize(prefix)
+        keys = self._title_keys
+        i = bisect_left(keys, prefix)
+        end = min(i + limit, len(keys))
+        matches = []
+        while i < end and keys[i].startswith(prefix):
+            matches.append(self._title_books[i])
+            i += 1
+        return matches
+
+    def search(self, query, limit=None):
+        # Books matching every word of the query, best matches first
+        postings = [self._postings.get(token) for token in set(_tokens(query))]
+        if not postings or None in postings:
+            return []
+        postings.sort(key=len)
+        scored = []
+        for book, weight in postings[0].items():
+            score = weight
+            for posting in postings[1:]:
+                other = posting.get(book)
+                if other is None:
+                    break
+                score += other
+            else:
+                scored.append((score, book))
+        scored.sort(key=lambda match: match[0], reverse=True)
+        return [book for score, book in scored[:limit]]
 
 # Subclass for digital libraries with download size
 class EBook(Book):
+    __slots__ = ("download_size",)
+
     def __init__(self, title, author, isbn, download_size):
         super().__init__(title, author, isbn)
         self.download_size = download_size  # in MB
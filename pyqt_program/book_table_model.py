@@ -0,0 +1,135 @@
+# book_table_model.py
+
+from bisect import bisect_left
+from itertools import islice
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+from book_library import EBook
+
+# Table model over a Library listing. Rows are pulled from the listing in
+# batches as the view scrolls (canFetchMore/fetchMore), and cells are only
+# formatted when the view asks for them, so a huge catalog costs no more
+# than the rows on screen.
+class BookTableModel(QAbstractTableModel):
+    HEADERS = ("Title", "Author", "ISBN", "Status", "Download Size")
+    BATCH_SIZE = 200
+
+    def __init__(self, library, parent=None):
+        super().__init__(parent)
+        self.library = library
+        self._books = []  # rows fetched so far
+        # Rows are numbered as they are appended; the numbers stay ascending
+        # down the table, so a book's row is found by bisecting them
+        self._numbers = []  # parallel to _books
+        self._number_of = {}  # book -> its row's number
+        self._next_number = 0
+        self._source = iter(())  # rows not fetched yet
+        self._peeked = []  # at most one book taken from _source by canFetchMore
+        self._tail = []  # books added to a live listing before it was fully fetched
+        self._live = False
+        library.subscribe(self.on_library_event)
+
+    def show(self, books, live=False):
+        # live listings show available books and follow library events;
+        # others (search results) only keep their rows' status current
+        self.beginResetModel()
+        self._books = []
+        self._numbers = []
+        self._number_of = {}
+        self._source = iter(books)
+        self._peeked = []
+        self._tail = []
+        self._live = live
+        self.endResetModel()
+
+    def book(self, row):
+        return self._books[row]
+
+    def _wanted(self, book):
+        return not self._live or book in self.library.available()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._books)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        book = self._books[index.row()]
+        column = index.column()
+        if column == 0:
+            return book.title
+        if column == 1:
+            return book.author
+        if column == 2:
+            return book.isbn
+        if column == 3:
+            return "Lent" if book.is_lent else "Available"
+        return f"{book.download_size}MB" if isinstance(book, EBook) else ""
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        if not self._peeked and not self._tail:
+            # Peek, so the view stops asking once the listing is exhausted
+            self._peeked = list(islice(self._source, 1))
+        return bool(self._peeked or self._tail)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        pulled = self._peeked + list(islice(self._source, self.BATCH_SIZE - len(self._peeked)))
+        self._peeked = []
+        if len(pulled) < self.BATCH_SIZE:
+            pulled += self._tail
+            self._tail = []
+        batch = [book for book in dict.fromkeys(pulled) if book not in self._number_of and self._wanted(book)]
+        if batch:
+            self.beginInsertRows(QModelIndex(), len(self._books), len(self._books) + len(batch) - 1)
+            for book in batch:
+                self._add_row(book)
+            self.endInsertRows()
+
+    def _add_row(self, book):
+        self._books.append(book)
+        self._numbers.append(self._next_number)
+        self._number_of[book] = self._next_number
+        self._next_number += 1
+
+    def _row(self, book):
+        return bisect_left(self._numbers, self._number_of[book])
+
+    def _append(self, book):
+        row = len(self._books)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._add_row(book)
+        self.endInsertRows()
+
+    def _remove(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._number_of[self._books.pop(row)]
+        self._numbers.pop(row)
+        self.endRemoveRows()
+
+    def on_library_event(self, event, book):
+        if self._live and event in ("added", "returned"):
+            # Rows not fetched yet are picked up by fetchMore
+            if self.canFetchMore():
+                self._tail.append(book)
+            elif book not in self._number_of:
+                self._append(book)
+            return
+        if event == "added" or book not in self._number_of:
+            return  # not fetched yet; _wanted filters it when it is
+        row = self._row(book)
+        if event == "removed" or (self._live and event == "lent"):
+            self._remove(row)
+        else:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
@@ -1,15 +1,22 @@
 import sys
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QLineEdit, QPushButton, QVBoxLayout,
-    QHBoxLayout, QCheckBox, QListWidget, QMessageBox, QInputDialog, QFormLayout
+    QHBoxLayout, QCheckBox, QTableView, QHeaderView, QMessageBox, QInputDialog,
+    QFormLayout, QCompleter
 )
+from PyQt5.QtCore import QStringListModel, Qt
 from PyQt5.QtGui import QFont
 from book_library import Book, EBook, Library, BookNotAvailableError
+from book_table_model import BookTableModel
+from task_runner import TaskCancelled, TaskRunner
 
 class LibraryGUI(QWidget):
     def __init__(self):
         super().__init__()
         self.library = Library()
+        self.showing_available = False  # False while search results are listed
+        self.tasks = TaskRunner(parent=self)
+        self.task = None  # the running background task, if any
         self.init_ui()
 
     def init_ui(self):
@@ -31,6 +38,13 @@ class LibraryGUI(QWidget):
 
         self.ebook_checkbox.stateChanged.connect(self.toggle_size_input)
 
+        # Suggest existing titles while typing, e.g. when adding another copy
+        self.title_completions = QStringListModel()
+        title_completer = QCompleter(self.title_completions, self)
+        title_completer.setCaseSensitivity(Qt.CaseInsensitive)
+        self.title_input.setCompleter(title_completer)
+        self.title_input.textEdited.connect(self.update_title_completions)
+
         form_layout.addRow("Title:", self.title_input)
         form_layout.addRow("Author:", self.author_input)
         form_layout.addRow("ISBN:", self.isbn_input)
@@ -44,8 +58,9 @@ class LibraryGUI(QWidget):
         self.return_button = QPushButton("Return Book")
         self.remove_button = QPushButton("Remove Book")
         self.search_button = QPushButton("Search by Author")
+        self.find_button = QPushButton("Search Catalog")
 
-        for btn in [self.add_button, self.lend_button, self.return_button, self.remove_button, self.search_button]:
+        for btn in [self.add_button, self.lend_button, self.return_button, self.remove_button, self.search_button, self.find_button]:
             btn.setFont(font_button)
             button_layout.addWidget(btn)
 
@@ -55,17 +70,37 @@ class LibraryGUI(QWidget):
         self.return_button.clicked.connect(self.return_book)
         self.remove_button.clicked.connect(self.remove_book)
         self.search_button.clicked.connect(self.search_by_author)
+        self.find_button.clicked.connect(self.search_catalog)
 
-        # Book List
-        self.book_list = QListWidget()
+        # Book List: the model formats only the rows in view
+        self.list_label = QLabel()
+        self.book_model = BookTableModel(self.library, self)
+        self.book_list = QTableView()
+        self.book_list.setModel(self.book_model)
+        self.book_list.setSelectionBehavior(QTableView.SelectRows)
+        self.book_list.verticalHeader().hide()
+        self.book_list.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.book_list.horizontalHeader().setStretchLastSection(True)
         self.update_book_list()
 
+        # Status of the running background task
+        status_layout = QHBoxLayout()
+        self.status_label = QLabel()
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setFont(font_button)
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_task)
+        status_layout.addWidget(self.status_label)
+        status_layout.addStretch()
+        status_layout.addWidget(self.cancel_button)
+
         # Main Layout
         main_layout = QVBoxLayout()
         main_layout.addLayout(form_layout)
         main_layout.addLayout(button_layout)
-        main_layout.addWidget(QLabel("Available Books:"))
+        main_layout.addWidget(self.list_label)
         main_layout.addWidget(self.book_list)
+        main_layout.addLayout(status_layout)
 
         self.setLayout(main_layout)
 
@@ -74,6 +109,10 @@ class LibraryGUI(QWidget):
         if not state:
             self.size_input.clear()
 
+    def update_title_completions(self, text):
+        books = self.library.titles_starting_with(text, limit=20) if text.strip() else []
+        self.title_completions.setStringList(list(dict.fromkeys(book.title for book in books)))
+
     def add_book(self):
         title = self.title_input.text()
         author = self.author_input.text()
@@ -95,11 +134,11 @@ class LibraryGUI(QWidget):
 
         self.library.add_book(book)
         QMessageBox.information(self, "Success", f"Book '{title}' added successfully.")
-        self.update_book_list()
+        self.show_available_books()
         self.clear_inputs()
 
     def lend_book(self):
-        available_books = [book for book in self.library.books if not book.is_lent]
+        available_books = self.library.available()
         if not available_books:
             QMessageBox.information(self, "No Books", "No books available to lend.")
             return
@@ -111,12 +150,12 @@ class LibraryGUI(QWidget):
             try:
                 self.library.lend_book(isbn)
                 QMessageBox.information(self, "Success", "Book lent successfully.")
-                self.update_book_list()
+                self.show_available_books()
             except BookNotAvailableError as e:
                 QMessageBox.warning(self, "Error", str(e))
 
     def return_book(self):
-        lent_books = [book for book in self.library.books if book.is_lent]
+        lent_books = self.library.lent()
         if not lent_books:
             QMessageBox.information(self, "No Books", "No books currently lent out.")
             return
@@ -128,7 +167,7 @@ class LibraryGUI(QWidget):
             try:
                 self.library.return_book(isbn)
                 QMessageBox.information(self, "Success", "Book returned successfully.")
-                self.update_book_list()
+                self.show_available_books()
             except BookNotAvailableError as e:
                 QMessageBox.warning(self, "Error", str(e))
 
@@ -137,25 +176,87 @@ class LibraryGUI(QWidget):
         if ok and isbn:
             self.library.remove_book(isbn)
             QMessageBox.information(self, "Success", "Book removed from library.")
-            self.update_book_list()
+            self.show_available_books()
+
+    def start_task(self, label, fn, *args, done):
+        # Run fn(task, *args) on the thread pool. The library is not
+        # thread-safe, so buttons that change it are disabled meanwhile.
+        def finish(callback):
+            def call(value):
+                self.set_busy(None)
+                callback(value)
+            return call
+
+        def failed(e):
+            if not isinstance(e, TaskCancelled):
+                QMessageBox.warning(self, "Error", str(e))
+
+        self.set_busy(label)
+        self.task = self.tasks.submit(fn, *args, done=finish(done), error=finish(failed))
+
+    def set_busy(self, label):
+        busy = label is not None
+        for btn in [self.add_button, self.lend_button, self.return_button, self.remove_button, self.search_button, self.find_button]:
+            btn.setEnabled(not busy)
+        self.cancel_button.setEnabled(busy)
+        self.status_label.setText(f"{label}..." if busy else "")
+        if not busy:
+            self.task = None
+
+    def cancel_task(self):
+        if self.task is not None:
+            self.task.cancel()
+
+    def closeEvent(self, event):
+        self.tasks.close()
+        super().closeEvent(event)
 
     def search_by_author(self):
         author, ok = QInputDialog.getText(self, "Search by Author", "Enter author's name:")
         if ok and author:
-            books = list(self.library.books_by_author(author))
-            self.book_list.clear()
-            if books:
-                self.book_list.addItem(f"Books by {author}:")
-                for book in books:
-                    self.book_list.addItem(str(book))
-            else:
-                QMessageBox.information(self, "Not Found", "No books found by that author.")
+            def lookup(task):
+                books = list(self.library.books_by_author(author))
+                task.check()
+                return books, ([] if books else self.library.similar_authors(author))
+
+            def found(result):
+                books, suggestions = result
+                if books:
+                    self.show_results(f"Books by {author}:", books)
+                else:
+                    message = "No books found by that author."
+                    if suggestions:
+                        message += "\n\nDid you mean: " + ", ".join(suggestions) + "?"
+                    QMessageBox.information(self, "Not Found", message)
+
+            self.start_task("Searching", lookup, done=found)
+
+    def search_catalog(self):
+        query, ok = QInputDialog.getText(self, "Search Catalog", "Enter title or author words:")
+        if ok and query:
+            def found(books):
+                if books:
+                    self.show_results(f"Results for '{query}':", books)
+                else:
+                    QMessageBox.information(self, "Not Found", "No books match that search.")
+
+            self.start_task("Searching", lambda task: self.library.search(query), done=found)
 
     def update_book_list(self):
-        self.book_list.clear()
-        self.book_list.addItem("Available Books:")
-        for book in self.library:
-            self.book_list.addItem(str(book))
+        self.list_label.setText("Available Books:")
+        self.book_model.show(self.library, live=True)
+        self.showing_available = True
+
+    def show_available_books(self):
+        # The available list keeps itself current through library events;
+        # it only needs resetting when search results replaced it
+        if not self.showing_available:
+            self.update_book_list()
+
+    def show_results(self, label, books):
+        self.list_label.setText(label)
+        self.book_model.show(books)
+        self.showing_available = False
 
     def clear_inputs(self):
         self.title_input.clear()
@@ -0,0 +1,92 @@
+# task_runner.py
+
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+class TaskCancelled(Exception):
+    pass
+
+# Lives in the GUI thread, so a signal emitted from a pool thread is queued
+# and the callback it carries runs in the GUI thread
+class _Relay(QObject):
+    call = pyqtSignal(object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.call.connect(self._deliver)
+
+    @pyqtSlot(object, object)
+    def _deliver(self, callback, value):
+        callback(value)
+
+# One background operation on the QThreadPool. The function it runs gets
+# the task as its first argument, to report progress and check for
+# cancellation at safe points.
+class Task(QRunnable):
+    def __init__(self, runner, fn, args, progress, done, error):
+        super().__init__()
+        self._runner = runner
+        self._fn = fn
+        self._args = args
+        self._progress = progress
+        self._done = done
+        self._error = error
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        # Takes effect at the task's next check() or report()
+        self._cancel.set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise TaskCancelled("Task cancelled.")
+
+    def report(self, value):
+        # Called by the task function; doubles as a cancellation point
+        self.check()
+        if self._progress is not None:
+            self._runner.relay.call.emit(self._progress, value)
+
+    def run(self):
+        try:
+            self.check()
+            result = self._fn(self, *self._args)
+            self.check()
+        except Exception as e:
+            self._runner.relay.call.emit(self._runner.finish(self, self._error), e)
+        else:
+            self._runner.relay.call.emit(self._runner.finish(self, self._done), result)
+
+# Runs long operations off the GUI thread. progress(value) follows each
+# task.report(value), then either done(result) or error(exception) is
+# called, with TaskCancelled if the task was cancelled; all of them in the
+# GUI thread.
+class TaskRunner:
+    def __init__(self, pool=None, parent=None):
+        self.pool = pool or QThreadPool.globalInstance()
+        self.relay = _Relay(parent)
+        self._tasks = set()  # keeps running tasks' Python objects alive
+
+    def submit(self, fn, *args, progress=None, done=None, error=None):
+        task = Task(self, fn, args, progress, done, error)
+        task.setAutoDelete(False)
+        self._tasks.add(task)
+        self.pool.start(task)
+        return task
+
+    def finish(self, task, callback):
+        def call(value):
+            self._tasks.discard(task)
+            if callback is not None:
+                callback(value)
+        return call
+
+    def close(self):
+        for task in self._tasks:
+            task.cancel()
+        self.pool.waitForDone()
@@ -0,0 +1,97 @@
+# async_library.py
+#
+# asyncio facade over any Library backend. Operations are awaitable and run
+# on an executor so that blocking backends (SqliteLibrary, the fsyncs in
+# JournaledLibrary) never stall the event loop. The default executor has a
+# single worker, which also serializes access to backends that are not
+# thread-safe; pass offload=False to run a purely in-memory backend inline.
+#
+#     library = AsyncLibrary(SqliteLibrary(path, check_same_thread=False))
+#     await library.lend_book(isbn)
+#     async for book in library.books_by_author("Tolkien"):
+#         ...
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+CHUNK_SIZE = 500  # books fetched per executor call when iterating
+
+class AsyncLibrary:
+    def __init__(self, library, executor=None, offload=True):
+        self.library = library
+        self.offload = offload
+        self._owns_executor = executor is None and offload
+        if self._owns_executor:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="library")
+        self._executor = executor
+
+    async def _run(self, function, *args):
+        if not self.offload:
+            return function(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, function, *args)
+
+    async def _iterate(self, make_iterator, *args):
+        # The backend iterator is created and drained on the executor, a
+        # chunk at a time
+        iterator = await self._run(make_iterator, *args)
+        while True:
+            chunk = await self._run(list, islice(iterator, CHUNK_SIZE))
+            for book in chunk:
+                yield book
+            if len(chunk) < CHUNK_SIZE:
+                return
+
+    async def close(self):
+        close = getattr(self.library, "close", None)
+        if close is not None:
+            await self._run(close)
+        if self._owns_executor:
+            self._executor.shutdown()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def __aiter__(self):
+        # Available books, like iterating a Library
+        return self._iterate(iter, self.library)
+
+    def books_by_author(self, author):
+        return self._iterate(self.library.books_by_author, author)
+
+    async def count(self):
+        return await self._run(len, self.library)
+
+    async def get_book(self, isbn):
+        return await self._run(self.library.get_book, isbn)
+
+    async def add_book(self, book):
+        await self._run(self.library.add_book, book)
+
+    async def add_books(self, books):
+        await self._run(self.library.add_books, list(books))
+
+    async def remove_book(self, isbn):
+        await self._run(self.library.remove_book, isbn)
+
+    async def lend_book(self, isbn):
+        await self._run(self.library.lend_book, isbn)
+
+    async def return_book(self, isbn):
+        await self._run(self.library.return_book, isbn)
+
+    async def lend_many(self, isbns):
+        return await self._run(self.library.lend_many, list(isbns))
+
+    async def return_many(self, isbns):
+        return await self._run(self.library.return_many, list(isbns))
+
+    async def titles_starting_with(self, prefix, limit=10):
+        return await self._run(self.library.titles_starting_with, prefix, limit)
+
+    async def search(self, query, limit=None):
+        return await self._run(self.library.search, query, limit)
@@ -0,0 +1,429 @@
+# benchmark.py
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from async_library import AsyncLibrary
+from book_library import Book, BookNotAvailableError, EBook, Library
+from catalog_file import MappedCatalog, write_catalog
+from columnar_library import ColumnarLibrary
+from concurrent_library import ConcurrentLibrary
+from importer import import_books
+from journal_library import JournaledLibrary
+from sqlite_library import SqliteLibrary
+
+
+def make_library(n):
+    library = Library()
+    for i in range(n):
+        library.add_book(Book(f"Title {i}", f"Author {i % 1000}", str(i)))
+    return library
+
+
+def bench_isbn_ops(sizes=(1_000, 10_000, 100_000, 1_000_000), rounds=10_000):
+    print("ISBN-keyed operations (lend + return of a book at the end of the catalog)")
+    for n in sizes:
+        library = make_library(n)
+        isbn = str(n - 1)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            library.lend_book(isbn)
+            library.return_book(isbn)
+        elapsed = time.perf_counter() - start
+        print(f"  {n:>9} books: {elapsed / rounds * 1e6:8.2f} us per lend+return")
+
+
+# Dict-backed equivalents of Book/EBook, kept only as the memory baseline
+class DictBook:
+    def __init__(self, title, author, isbn):
+        self.title = title
+        self.author = author
+        self.isbn = isbn
+        self.is_lent = False
+
+
+class DictEBook(DictBook):
+    def __init__(self, title, author, isbn, size):
+        super().__init__(title, author, isbn)
+        self.size = size
+
+
+def bytes_per_book(book_cls, ebook_cls, n):
+    # Strings are created up front so only the record objects are measured
+    rows = [(f"Title {i}", f"Author {i % 1000}", str(i)) for i in range(n)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    books = [ebook_cls(*row, 1.5) if i % 2 else book_cls(*row) for i, row in enumerate(rows)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before - sys.getsizeof(books)) / len(books)
+
+
+def bench_memory(n=200_000):
+    print(f"Memory per record ({n} books, half of them eBooks)")
+    print(f"  dict-backed: {bytes_per_book(DictBook, DictEBook, n):6.1f} bytes")
+    print(f"  __slots__:   {bytes_per_book(Book, EBook, n):6.1f} bytes")
+
+
+def bench_columnar(n=200_000):
+    print(f"Catalog memory ({n} books, half of them eBooks)")
+    for library_cls in (Library, ColumnarLibrary):
+        tracemalloc.start()
+        library = library_cls()
+        for i in range(n):
+            row = (f"Title {i}", f"Author {i % 1000}", str(i))
+            library.add_book(EBook(*row, 1.5) if i % 2 else Book(*row))
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"  {library_cls.__name__:<16} {used / n:6.1f} bytes per book")
+
+
+def bench_fuzzy_authors(n=100_000, rounds=50):
+    syllables = ("ka lo mi ren tol kien sha ve dor an bel cor dru fen gal hin jor kel mar nor "
+                 "pel quin ros sel tam ur val wen xan yor zel bri cla dem eth fra gwi har ith").split()
+    rng = random.Random(0)
+    authors = set()
+    while len(authors) < n:
+        first = "".join(rng.choice(syllables) for _ in range(rng.randint(1, 3)))
+        last = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 3)))
+        authors.add(f"{first.title()} {last.title()}")
+    library = Library()
+    for i, author in enumerate(sorted(authors)):
+        library.add_book(Book(f"Title {i}", author, str(i)))
+    print(f"Fuzzy author lookup over {n} distinct authors")
+    for query in ("Tolkein", "Marel Dorkien"):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            matches = library.similar_authors(query)
+        elapsed = time.perf_counter() - start
+        print(f"  {query!r:<16} {elapsed / rounds * 1e3:6.2f} ms -> {matches}")
+
+
+def bench_sqlite(n=200_000, rounds=10_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        library = SqliteLibrary(os.path.join(tmp, "catalog.db"))
+        start = time.perf_counter()
+        library.add_books(Book(f"Title {i}", f"Author {i % 1000}", str(i)) for i in range(n))
+        elapsed = time.perf_counter() - start
+        print(f"SQLite catalog ({n} books)")
+        print(f"  batched insert:  {n / elapsed:10.0f} books/s")
+        isbn = str(n - 1)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            library.lend_book(isbn)
+            library.return_book(isbn)
+        elapsed = time.perf_counter() - start
+        print(f"  lend+return:     {elapsed / rounds * 1e6:10.2f} us")
+        start = time.perf_counter()
+        for i in range(rounds):
+            list(library.books_by_author(f"Author {i % 1000}"))
+        elapsed = time.perf_counter() - start
+        print(f"  books_by_author: {elapsed / rounds * 1e6:10.2f} us ({n // 1000} results)")
+        for label, lookup in (("search", lambda: library.search("title 12345 author", 10)),
+                              ("similar_authors", lambda: library.similar_authors("Autor 12"))):
+            start = time.perf_counter()
+            for _ in range(100):
+                lookup()
+            elapsed = time.perf_counter() - start
+            print(f"  {label + ':':<16} {elapsed / 100 * 1e6:10.2f} us")
+        library.close()
+
+
+def bench_journal(n=100_000, rounds=20_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        library = JournaledLibrary(tmp, snapshot_every=n + 2 * rounds)
+        for i in range(n):
+            library.add_book(Book(f"Title {i}", f"Author {i % 1000}", str(i)))
+        library.snapshot()
+        start = time.perf_counter()
+        for i in range(rounds):
+            library.lend_book(str(i))
+            library.return_book(str(i))
+        library.sync()
+        elapsed = time.perf_counter() - start
+        library.close()
+        print(f"Journaled library ({n} books)")
+        print(f"  durable lend/return: {2 * rounds / elapsed:10.0f} ops/s")
+        start = time.perf_counter()
+        JournaledLibrary(tmp).close()
+        elapsed = time.perf_counter() - start
+        print(f"  recovery (snapshot + {2 * rounds} journal records): {elapsed:.2f} s")
+
+
+def bench_catalog_file(n=1_000_000, rounds=10_000):
+    library = ColumnarLibrary()
+    for i in range(n):
+        row = (f"Title {i}", f"Author {i % 1000}", str(i))
+        library.add_book(EBook(*row, 1.5) if i % 2 else Book(*row))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.bin")
+        write_catalog(library, path)
+        print(f"Binary catalog file ({n} books, {os.path.getsize(path) / 1e6:.1f} MB)")
+        start = time.perf_counter()
+        catalog = MappedCatalog(path)
+        elapsed = time.perf_counter() - start
+        print(f"  open:            {elapsed * 1e3:8.2f} ms")
+        start = time.perf_counter()
+        for i in range(rounds):
+            catalog.get_book(str(i * 97 % n))
+        elapsed = time.perf_counter() - start
+        print(f"  get_book:        {elapsed / rounds * 1e6:8.2f} us")
+        catalog.close()
+
+
+def bench_import(n=200_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "books.csv")
+        with open(path, "w", newline="") as fp:
+            fp.write("title,author,isbn,size\n")
+            fp.writelines(f"Title {i},Author {i % 1000},{i},{'1.5' if i % 2 else ''}\n" for i in range(n))
+        print(f"CSV import ({n} rows)")
+        for batch_size in (1, 10_000):
+            report = import_books(Library(), path, batch_size=batch_size)
+            print(f"  batch size {batch_size:>6}: {report.rows_per_second:10.0f} rows/s")
+
+
+def bench_export(n=500_000):
+    library = make_library(n)
+    print(f"Export ({n} books)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for format in ("csv", "jsonl"):
+            path = os.path.join(tmp, f"books.{format}")
+            start = time.perf_counter()
+            with open(path, "w", newline="", encoding="utf-8") as fp:
+                library.export(fp, format)
+            elapsed = time.perf_counter() - start
+            # Second run under tracemalloc, which would skew the timing
+            tracemalloc.start()
+            with open(path, "w", newline="", encoding="utf-8") as fp:
+                library.export(fp, format)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"  {format:<5} {n / elapsed:10.0f} books/s, peak {peak / 1024:8.1f} KiB")
+
+
+class _SlowStatusBook(Book):
+    # Reading is_lent sleeps, which holds every racing thread between
+    # lend_book's "is it lent?" check and its update
+    __slots__ = ()
+
+    @property
+    def is_lent(self):
+        lent = Book.is_lent.__get__(self)
+        time.sleep(0.001)
+        return lent
+
+    @is_lent.setter
+    def is_lent(self, value):
+        Book.is_lent.__set__(self, value)
+
+
+def race_lends(library, books=20, threads=8):
+    # Every thread lends every book; returns how many books were lent more
+    # than once or broke the library's partitions
+    library.add_books(_SlowStatusBook(f"Title {i}", "Author", str(i)) for i in range(books))
+    lends = [0] * books
+    broken = set()
+    start = threading.Barrier(threads)
+
+    def lend_all():
+        start.wait()
+        for i in range(books):
+            try:
+                library.lend_book(str(i))
+                lends[i] += 1
+            except BookNotAvailableError:
+                pass
+            except KeyError:
+                broken.add(i)  # a second lend found the book gone from the available set
+
+    workers = [threading.Thread(target=lend_all) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return len(broken | {i for i, count in enumerate(lends) if count > 1})
+
+
+def bench_concurrent(n=10_000, threads=(1, 2, 4, 8), rounds=20_000):
+    # Correctness: the race must show up on the unsynchronized Library,
+    # or the check proves nothing, and must not on ConcurrentLibrary
+    unsafe = race_lends(Library())
+    safe = race_lends(ConcurrentLibrary())
+    print(f"Concurrent lending race (8 threads, 20 books): Library {unsafe} double lends, "
+          f"ConcurrentLibrary {safe}")
+    if unsafe == 0:
+        raise AssertionError("the race did not trigger on Library; the check is not exercising it")
+    if safe != 0:
+        raise AssertionError(f"ConcurrentLibrary lent {safe} books more than once")
+
+    # Throughput: each thread lends and returns its own disjoint books
+    print("  lend+return throughput on disjoint books")
+    for count in threads:
+        library = ConcurrentLibrary()
+        library.add_books(Book(f"Title {i}", f"Author {i % 100}", str(i)) for i in range(n))
+
+        def circulate(worker):
+            isbns = [str(i) for i in range(worker, n, count)]
+            for i in range(rounds // count):
+                isbn = isbns[i % len(isbns)]
+                library.lend_book(isbn)
+                library.return_book(isbn)
+
+        workers = [threading.Thread(target=circulate, args=(worker,)) for worker in range(count)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        print(f"  {count:>2} threads: {2 * rounds / elapsed:10.0f} ops/s")
+
+
+def bench_async(n=10_000, clients=1_000, rounds=10):
+    async def run(library):
+        await library.add_books(Book(f"Title {i}", f"Author {i % 100}", str(i)) for i in range(n))
+        lag = 0.0
+
+        async def ticker():
+            # Worst delay the event loop adds to a 1 ms sleep
+            nonlocal lag
+            while True:
+                start = time.perf_counter()
+                await asyncio.sleep(0.001)
+                lag = max(lag, time.perf_counter() - start - 0.001)
+
+        async def client(i):
+            for _ in range(rounds):
+                await library.lend_book(str(i))
+                await library.return_book(str(i))
+
+        tick = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        await asyncio.gather(*(client(i) for i in range(clients)))
+        elapsed = time.perf_counter() - start
+        await asyncio.sleep(0.002)  # let the ticker see any stall that ran to the end
+        tick.cancel()
+        await library.close()
+        return 2 * clients * rounds / elapsed, lag
+
+    print(f"AsyncLibrary ({clients} concurrent clients)")
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = [
+            ("Library, inline", AsyncLibrary(Library(), offload=False)),
+            ("SqliteLibrary, executor", AsyncLibrary(SqliteLibrary(os.path.join(tmp, "catalog.db"), check_same_thread=False))),
+        ]
+        for name, library in backends:
+            ops, lag = asyncio.run(run(library))
+            print(f"  {name:<24} {ops:10.0f} ops/s, worst loop lag {lag * 1e3:6.2f} ms")
+
+
+def bench_paging(n=1_000_000, limit=50, rounds=1_000):
+    library = Library()
+    library.add_books(Book(f"Title {i}", f"Author {i % 1000}", str(i)) for i in range(n))
+    print(f"Paging ({n} books, {limit} per page)")
+    for depth in (0, n // 2, n - limit):
+        _, cursor = library.page(limit=depth) if depth else (None, None)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            library.page(after=cursor, limit=limit)
+        elapsed = time.perf_counter() - start
+        print(f"  page at {depth:>9}: {elapsed / rounds * 1e6:8.2f} us")
+
+
+def bench_treeview(sizes=(10_000, 100_000), changed=10):
+    # Needs a display: Treeview calls go through a real Tk interpreter
+    import tkinter as tk
+    from tkinter import ttk
+    from tree_sync import TreeviewSync
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Treeview refresh: skipped ({e})")
+        return
+    root.withdraw()
+    print(f"Treeview refresh after {changed} lends")
+    for n in sizes:
+        library = make_library(n)
+        tree = ttk.Treeview(root, columns=("title", "author", "isbn", "status"), show="headings")
+        rows = [(book.isbn, (book.title, book.author, book.isbn, "Available")) for book in library.books]
+        sync = TreeviewSync(tree)
+        sync.reconcile(rows)
+        for i in range(changed):
+            isbn = str(i * (n // changed))
+            rows[int(isbn)] = (isbn, rows[int(isbn)][1][:3] + ("Lent",))
+        start = time.perf_counter()
+        tree.delete(*tree.get_children())
+        for isbn, values in rows:
+            tree.insert("", "end", values=values)
+        rebuild = time.perf_counter() - start
+        tree.delete(*tree.get_children())
+        sync = TreeviewSync(tree)
+        sync.reconcile((isbn, values[:3] + ("Available",)) for isbn, values in rows)
+        start = time.perf_counter()
+        sync.reconcile(rows)
+        reconcile = time.perf_counter() - start
+        print(f"  {n:>7} rows: full rebuild {rebuild * 1e3:9.1f} ms, keyed reconcile {reconcile * 1e3:7.1f} ms")
+        tree.destroy()
+    root.destroy()
+
+
+def bench_virtual(sizes=(100_000, 1_000_000), scrolls=1_000):
+    # Needs a display, like bench_treeview
+    import tkinter as tk
+    from tkinter import ttk
+    from virtual_tree import VirtualBookList
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Virtual Treeview: skipped ({e})")
+        return
+    root.withdraw()
+    print("Virtual Treeview window (20 rows)")
+    for n in sizes:
+        library = make_library(n)
+        tree = ttk.Treeview(root, columns=("title", "author", "isbn"), show="headings", height=20)
+        scrollbar = ttk.Scrollbar(root)
+        window = VirtualBookList(tree, scrollbar, library, lambda book: (book.title, book.author, book.isbn))
+        start = time.perf_counter()
+        window.refresh()
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        window.yview("moveto", "0.999")
+        jump = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(scrolls):
+            window.yview("scroll", -1, "units")
+        scroll = (time.perf_counter() - start) / scrolls
+        print(f"  {n:>8} books: first render {first * 1e3:6.1f} ms, jump to end {jump * 1e3:6.1f} ms, "
+              f"one-row scroll {scroll * 1e6:6.1f} us")
+        tree.destroy()
+        scrollbar.destroy()
+    root.destroy()
+
+
+BENCHMARKS = {
+    "isbn": bench_isbn_ops,
+    "memory": bench_memory,
+    "columnar": bench_columnar,
+    "fuzzy": bench_fuzzy_authors,
+    "sqlite": bench_sqlite,
+    "journal": bench_journal,
+    "catalog": bench_catalog_file,
+    "import": bench_import,
+    "export": bench_export,
+    "concurrent": bench_concurrent,
+    "async": bench_async,
+    "paging": bench_paging,
+    "treeview": bench_treeview,
+    "virtual": bench_virtual,
+}
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
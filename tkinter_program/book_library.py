@@ -1,6 +1,16 @@
 # book_library.py
 
+from bisect import bisect_left, bisect_right
+from collections import Counter
+import csv
+from itertools import chain
+import json
+import math
+import re
+
 class Book:
+    __slots__ = ("title", "author", "isbn", "is_lent")
+
     def __init__(self, title, author, isbn):
         self.title = title
         self.author = author
@@ -11,6 +21,8 @@ class Book:
         return f"{self.title} by {self.author} (ISBN: {self.isbn})"
 
 class EBook(Book):
+    __slots__ = ("size",)
+
     def __init__(self, title, author, isbn, size):
         super().__init__(title, author, isbn)
         self.size = size  # ✅ THIS LINE IS CRITICAL!
@@ -21,40 +33,346 @@ class EBook(Book):
 class BookNotAvailableError(Exception):
     pass
 
+def _normalize(text):
+    return " ".join(text.casefold().split())
+
+def _tokens(text):
+    return re.findall(r"\w+", text.casefold())
+
+def _trigrams(text):
+    return {f"  {word} "[i:i + 3] for word in _tokens(text) for i in range(len(word) + 1)}
+
+def _token_weights(book):
+    weights = {}
+    for token in _tokens(book.title):
+        weights[token] = weights.get(token, 0) + 2
+    for token in _tokens(book.author):
+        weights[token] = weights.get(token, 0) + 1
+    return weights
+
+EXPORT_FIELDS = ("title", "author", "isbn", "size", "lent")
+
+def _export_rows(books):
+    for book in books:
+        yield book.title, book.author, book.isbn, book.size if isinstance(book, EBook) else None, book.is_lent
+
+def write_books(books, fp, format="csv"):
+    # Stream books to a text file one row at a time; the columns match what
+    # importer.import_books reads, lent status included
+    rows = _export_rows(books)
+    if format == "csv":
+        writer = csv.writer(fp)
+        writer.writerow(EXPORT_FIELDS)
+        writer.writerows(rows)
+    elif format == "jsonl":
+        fp.writelines(json.dumps(dict(zip(EXPORT_FIELDS, row))) + "\n" for row in rows)
+    else:
+        raise ValueError(f"Unsupported export format: {format!r}")
+
 class Library:
     def __init__(self):
-        self.books = []
+        self._books = {}  # ISBN -> Book, in insertion order
+        self._by_author = {}  # normalized author -> list of Books
+        self._available = {}  # available Books, used as an ordered set
+        self._lent = {}  # lent Books, used as an ordered set
+        self._title_keys = []  # sorted normalized titles
+        self._title_books = []  # Books, parallel to _title_keys
+        self._author_trigrams = {}  # trigram -> set of normalized authors
+        self._trigram_counts = {}  # normalized author -> number of trigrams
+        self._postings = {}  # token -> {Book: weight}
+        self._order = []  # Books in insertion order, None where removed
+        self._order_seqs = []  # sequence number of each _order slot, ascending
+        self._seqs = {}  # ISBN -> sequence number, the paging cursor
+        self._next_seq = 0
+        self._removed = 0  # None slots in _order
+        self._listeners = []  # called as listener(event, book) after each change
+        self.version = 0  # bumped on every mutation
+
+    @property
+    def books(self):
+        return list(self._books.values())
+
+    def __len__(self):
+        return len(self._books)
+
+    def __contains__(self, isbn):
+        return isbn in self._books
+
+    def __iter__(self):
+        return iter(list(self._available))
+
+    def available(self):
+        return self._available.keys()
+
+    def lent(self):
+        return self._lent.keys()
+
+    def get_book(self, isbn):
+        return self._books.get(isbn)
+
+    # Change events: "added", "removed", "lent" and "returned", one per book
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def _emit(self, event, book):
+        for listener in self._listeners:
+            listener(event, book)
 
     def add_book(self, book):
-        for existing in self.books:
-            if existing.isbn == book.isbn:
-                raise ValueError("Book with this ISBN already exists.")
-        self.books.append(book)
+        if book.isbn in self._books:
+            raise ValueError("Book with this ISBN already exists.")
+        self._books[book.isbn] = book
+        self._index(book)
+        self.version += 1
+        self._emit("added", book)
+
+    def add_books(self, books):
+        # Bulk add: a batch that is large next to the catalog has the title
+        # index re-sorted once instead of shifting the arrays for every book
+        books = list(books)
+        isbns = {book.isbn for book in books}
+        if len(isbns) < len(books) or any(isbn in self._books for isbn in isbns):
+            raise ValueError("Book with this ISBN already exists.")
+        resort = len(books) * 16 >= len(self._title_keys)
+        for book in books:
+            self._books[book.isbn] = book
+            self._index(book, titles=not resort)
+        if resort:
+            keys = self._title_keys + [_normalize(book.title) for book in books]
+            titled = self._title_books + books
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            self._title_keys = [keys[i] for i in order]
+            self._title_books = [titled[i] for i in order]
+        self.version += 1
+        for book in books:
+            self._emit("added", book)
 
     def remove_book(self, isbn):
-        for book in self.books:
-            if book.isbn == isbn:
-                self.books.remove(book)
-                return
-        raise ValueError("Book not found.")
+        book = self._books.pop(isbn, None)
+        if book is None:
+            raise ValueError("Book not found.")
+        self._unindex(book)
+        self.version += 1
+        self._emit("removed", book)
+
+    def _index(self, book, titles=True):
+        self._seqs[book.isbn] = self._next_seq
+        self._order.append(book)
+        self._order_seqs.append(self._next_seq)
+        self._next_seq += 1
+        key = _normalize(book.author)
+        same_author = self._by_author.get(key)
+        if same_author is None:
+            same_author = self._by_author[key] = []
+            trigrams = _trigrams(key)
+            self._trigram_counts[key] = len(trigrams)
+            for trigram in trigrams:
+                self._author_trigrams.setdefault(trigram, set()).add(key)
+        same_author.append(book)
+        (self._lent if book.is_lent else self._available)[book] = None
+        if titles:
+            key = _normalize(book.title)
+            i = bisect_right(self._title_keys, key)
+            self._title_keys.insert(i, key)
+            self._title_books.insert(i, book)
+        for token, weight in _token_weights(book).items():
+            self._postings.setdefault(token, {})[book] = weight
+
+    def _unindex(self, book):
+        i = bisect_left(self._order_seqs, self._seqs.pop(book.isbn))
+        self._order[i] = None
+        self._removed += 1
+        if self._removed * 2 > len(self._order):
+            live = [i for i, slot in enumerate(self._order) if slot is not None]
+            self._order = [self._order[i] for i in live]
+            self._order_seqs = [self._order_seqs[i] for i in live]
+            self._removed = 0
+        (self._lent if book.is_lent else self._available).pop(book)
+        key = _normalize(book.author)
+        same_author = self._by_author[key]
+        same_author.remove(book)
+        if not same_author:
+            del self._by_author[key]
+            del self._trigram_counts[key]
+            for trigram in _trigrams(key):
+                authors = self._author_trigrams[trigram]
+                authors.discard(key)
+                if not authors:
+                    del self._author_trigrams[trigram]
+        key = _normalize(book.title)
+        i = bisect_left(self._title_keys, key)
+        while self._title_books[i] is not book:
+            i += 1
+        del self._title_keys[i]
+        del self._title_books[i]
+        for token in _token_weights(book):
+            posting = self._postings[token]
+            del posting[book]
+            if not posting:
+                del self._postings[token]
 
     def lend_book(self, isbn):
-        for book in self.books:
-            if book.isbn == isbn:
-                if book.is_lent:
-                    raise BookNotAvailableError("Book is already lent.")
-                book.is_lent = True
-                return
-        raise BookNotAvailableError("Book not found.")
+        book = self._books.get(isbn)
+        if book is None:
+            raise BookNotAvailableError("Book not found.")
+        if book.is_lent:
+            raise BookNotAvailableError("Book is already lent.")
+        del self._available[book]
+        self._lent[book] = None
+        book.is_lent = True
+        self.version += 1
+        self._emit("lent", book)
 
     def return_book(self, isbn):
-        for book in self.books:
-            if book.isbn == isbn:
-                if not book.is_lent:
-                    raise BookNotAvailableError("Book was not lent.")
-                book.is_lent = False
-                return
-        raise BookNotAvailableError("Book not found.")
+        book = self._books.get(isbn)
+        if book is None:
+            raise BookNotAvailableError("Book not found.")
+        if not book.is_lent:
+            raise BookNotAvailableError("Book was not lent.")
+        del self._lent[book]
+        self._available[book] = None
+        book.is_lent = False
+        self.version += 1
+        self._emit("returned", book)
+
+    # Batch circulation is all-or-nothing: nothing changes unless every ISBN
+    # succeeds. Returns ISBN -> error message, None for ISBNs without one.
+    def lend_many(self, isbns):
+        return self._set_many(isbns, True, "Book is already lent.")
+
+    def return_many(self, isbns):
+        return self._set_many(isbns, False, "Book was not lent.")
+
+    def _set_many(self, isbns, lent, error):
+        results, books = {}, []
+        for isbn in isbns:
+            book = self._books.get(isbn)
+            if isbn in results:
+                results[isbn] = "ISBN appears more than once."
+            elif book is None:
+                results[isbn] = "Book not found."
+            elif book.is_lent == lent:
+                results[isbn] = error
+            else:
+                results[isbn] = None
+                books.append(book)
+        if any(results.values()):
+            return results
+        source, target = (self._available, self._lent) if lent else (self._lent, self._available)
+        for book in books:
+            del source[book]
+            target[book] = None
+            book.is_lent = lent
+        self.version += 1
+        for book in books:
+            self._emit("lent" if lent else "returned", book)
+        return results
+
+    def page(self, after=None, limit=50, filter=None, author=None):
+        # Up to `limit` books in insertion order after the cursor `after`,
+        # optionally only those passing `filter` or by `author`. Returns the
+        # books and the cursor for the next page, None once exhausted.
+        # Books added later show up on later pages; removed ones are skipped.
+        if limit < 1:
+            raise ValueError("Page limit must be at least 1.")
+        after = -1 if after is None else after
+        if author is not None:
+            # An author's books are kept in insertion order, so in cursor order
+            same_author = self._by_author.get(_normalize(author), [])
+            start = bisect_right(same_author, after, key=lambda book: self._seqs[book.isbn])
+            source = (same_author[i] for i in range(start, len(same_author)))
+        else:
+            order = self._order
+            start = bisect_right(self._order_seqs, after)
+            source = (order[i] for i in range(start, len(order)) if order[i] is not None)
+        books = []
+        for book in source:
+            if filter is None or filter(book):
+                books.append(book)
+                if len(books) == limit:
+                    return books, self._seqs[book.isbn]
+        return books, None
 
     def books_by_author(self, author):
-        return (book for book in self.books if book.author.lower() == author.lower())
+        return iter(list(self._by_author.get(_normalize(author), ())))
+
+    def export(self, fp, format="csv", available_only=False, author=None):
+        if author is not None:
+            books = self._by_author.get(_normalize(author), ())
+            if available_only:
+                books = (book for book in books if not book.is_lent)
+        else:
+            books = self._available if available_only else self._books.values()
+        write_books(books, fp, format)
+
+    def similar_authors(self, name, limit=5, threshold=0.4):
+        query = _trigrams(name)
+        if not query:
+            return []
+        need = max(1, math.ceil(threshold * len(query)))
+        # Posting sets rarest first. An author sharing at least `level` of the
+        # query's trigrams is in one of the rarest len(query) - level + 1
+        # sets, so levels are tried from the top, taking in one more set
+        # each time, until `limit` authors reach the level; everyone not
+        # counted by then ranks below them
+        postings = sorted((self._author_trigrams.get(trigram, frozenset()) for trigram in query), key=len)
+        n = len(postings)
+        counts = {}  # normalized author -> trigrams shared with the query
+        reaching = Counter()  # trigrams shared -> number of authors
+        seen = set()
+        partial = frozenset()  # authors from the last level's set that missed some set
+        for level in range(n, need - 1, -1):
+            if partial:
+                # Below their first level these can qualify too: count them
+                found = Counter(chain.from_iterable(partial & posting for posting in postings[n - level - 1:]))
+                counts.update(found)
+                reaching.update(found.values())
+            # Authors the new set brings are in none of the rarer sets, so
+            # only those in every remaining set reach this level
+            new = postings[n - level] - seen
+            seen |= new
+            full = new.intersection(*postings[n - level + 1:])
+            counts.update(dict.fromkeys(full, level))
+            reaching[level] += len(full)
+            partial = new - full
+            if sum(authors for common, authors in reaching.items() if common >= level) >= limit:
+                break
+        matches = []
+        for key, common in counts.items():
+            if common >= level:
+                # Ties on query coverage go to the author with fewer extra trigrams
+                matches.append((-common, self._trigram_counts[key], key))
+        matches.sort()
+        return [self._by_author[key][0].author for common, size, key in matches[:limit]]
+
+    def titles_starting_with(self, prefix, limit=10):
+        prefix = _normalize(prefix)
+        keys = self._title_keys
+        i = bisect_left(keys, prefix)
+        end = min(i + limit, len(keys))
+        matches = []
+        while i < end and keys[i].startswith(prefix):
+            matches.append(self._title_books[i])
+            i += 1
+        return matches
+
+    def search(self, query, limit=None):
+        postings = [self._postings.get(token) for token in set(_tokens(query))]
+        if not postings or None in postings:
+            return []
+        postings.sort(key=len)
+        scored = []
+        for book, weight in postings[0].items():
+            score = weight
+            for posting in postings[1:]:
+                other = posting.get(book)
+                if other is None:
+                    break
+                score += other
+            else:
+                scored.append((score, book))
+        scored.sort(key=lambda match: match[0], reverse=True)
+        return [book for score, book in scored[:limit]]
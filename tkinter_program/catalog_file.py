@@ -0,0 +1,210 @@
+# catalog_file.py
+#
+# Binary catalog format that is queried in place through mmap, so opening a
+# catalog costs the same whatever its size. Book/EBook objects are built
+# only for the rows a caller asks for, and they are detached copies.
+#
+# Layout (little-endian, sections 8-byte aligned):
+#   header       magic, version, book count, string count, section offsets
+#   strings      UTF-8 bytes of every title, ISBN and (interned) author
+#   offsets      string i spans offsets[i]:offsets[i + 1] of strings, u64
+#   records      per book: title id, author id, ISBN id (u32), size (f64,
+#                NaN for printed books)
+#   isbn index   row numbers sorted by ISBN (u32), for binary search
+#   lent bitmap  bit i set when book i is lent
+
+from bisect import bisect_left
+import math
+import mmap
+import os
+import struct
+
+from book_library import Book, EBook, BookNotAvailableError, _normalize
+
+MAGIC = b"BOOKCAT\0"
+VERSION = 1
+_HEADER = struct.Struct("<8sIIQQQQQQ")
+_RECORD = struct.Struct("<IIId")
+
+def _align(offset):
+    return -offset % 8
+
+def write_catalog(library, path):
+    books = library.books
+    strings, ids = [], {}
+
+    def intern(value, shared=False):
+        if shared and value in ids:
+            return ids[value]
+        strings.append(value.encode("utf-8"))
+        if shared:
+            ids[value] = len(strings) - 1
+        return len(strings) - 1
+
+    records = bytearray()
+    for book in books:
+        size = float(book.size) if isinstance(book, EBook) else math.nan
+        records += _RECORD.pack(intern(book.title), intern(book.author, shared=True), intern(book.isbn), size)
+    blob = b"".join(strings)
+    offsets = [0]
+    for value in strings:
+        offsets.append(offsets[-1] + len(value))
+    index = sorted(range(len(books)), key=lambda row: books[row].isbn)
+    lent = bytearray((len(books) + 7) // 8)
+    for row, book in enumerate(books):
+        if book.is_lent:
+            lent[row >> 3] |= 1 << (row & 7)
+
+    sections = [blob, struct.pack(f"<{len(offsets)}Q", *offsets), bytes(records),
+                struct.pack(f"<{len(index)}I", *index), bytes(lent)]
+    starts, position = [], _HEADER.size + _align(_HEADER.size)
+    for section in sections:
+        starts.append(position)
+        position += len(section) + _align(len(section))
+    # Written beside the target and renamed over it, so a crash leaves
+    # either the old catalog or the complete new one, never a torn file
+    with open(path + ".tmp", "wb") as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, len(books), len(strings), *starts[:5]))
+        file.write(b"\0" * _align(_HEADER.size))
+        for section in sections:
+            file.write(section)
+            file.write(b"\0" * _align(len(section)))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(path + ".tmp", path)
+
+class _IsbnKeys:
+    # Sequence view of the ISBNs in sorted order, for bisect
+    def __init__(self, catalog):
+        self._catalog = catalog
+
+    def __len__(self):
+        return len(self._catalog)
+
+    def __getitem__(self, i):
+        catalog = self._catalog
+        return catalog._string(catalog._record(catalog._index[i])[2])
+
+class _StatusView:
+    def __init__(self, catalog, lent):
+        self._catalog = catalog
+        self._lent = lent
+
+    def __len__(self):
+        catalog = self._catalog
+        lent = catalog._lent_count()
+        return lent if self._lent else len(catalog) - lent
+
+    def __iter__(self):
+        catalog = self._catalog
+        return (catalog._book(row) for row in range(len(catalog)) if catalog._is_lent(row) == self._lent)
+
+class MappedCatalog:
+    def __init__(self, path, writable=False):
+        # writable maps the file shared, so lend/return flip bits on disk
+        self._writable = writable
+        self._file = open(path, "r+b" if writable else "rb")
+        access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+        self._map = mmap.mmap(self._file.fileno(), 0, access=access)
+        magic, version, self._count, strings, *starts = _HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} catalog file.")
+        blob, offsets, records, index, lent = starts
+        view = memoryview(self._map)
+        self._blob = blob
+        self._offsets = view[offsets:offsets + 8 * (strings + 1)].cast("Q")
+        self._records = records
+        self._index = view[index:index + 4 * self._count].cast("I")
+        self._lent = view[lent:lent + (self._count + 7) // 8]
+
+    def close(self):
+        for name in ("_offsets", "_index", "_lent"):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _string(self, string_id):
+        start = self._blob + self._offsets[string_id]
+        end = self._blob + self._offsets[string_id + 1]
+        return self._map[start:end].decode("utf-8")
+
+    def _record(self, row):
+        return _RECORD.unpack_from(self._map, self._records + row * _RECORD.size)
+
+    def _is_lent(self, row):
+        return bool(self._lent[row >> 3] >> (row & 7) & 1)
+
+    def _lent_count(self):
+        return sum(bin(byte).count("1") for byte in self._lent)
+
+    def _book(self, row):
+        title, author, isbn, size = self._record(row)
+        title, author, isbn = self._string(title), self._string(author), self._string(isbn)
+        book = Book(title, author, isbn) if math.isnan(size) else EBook(title, author, isbn, size)
+        book.is_lent = self._is_lent(row)
+        return book
+
+    def _row(self, isbn):
+        keys = _IsbnKeys(self)
+        i = bisect_left(keys, isbn)
+        if i < self._count and keys[i] == isbn:
+            return self._index[i]
+        return None
+
+    @property
+    def books(self):
+        return [self._book(row) for row in range(self._count)]
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, isbn):
+        return self._row(isbn) is not None
+
+    def __iter__(self):
+        return iter(self.available())
+
+    def available(self):
+        return _StatusView(self, lent=False)
+
+    def lent(self):
+        return _StatusView(self, lent=True)
+
+    def get_book(self, isbn):
+        row = self._row(isbn)
+        return None if row is None else self._book(row)
+
+    def books_by_author(self, author):
+        # Authors are interned, so each distinct author id is decoded once
+        key, matches = _normalize(author), {}
+        for row in range(self._count):
+            author_id = self._record(row)[1]
+            if author_id not in matches:
+                matches[author_id] = _normalize(self._string(author_id)) == key
+            if matches[author_id]:
+                yield self._book(row)
+
+    def _set_lent(self, isbn, lent, error):
+        if not self._writable:
+            raise ValueError("Catalog file is open read-only.")
+        row = self._row(isbn)
+        if row is None:
+            raise BookNotAvailableError("Book not found.")
+        if self._is_lent(row) == lent:
+            raise BookNotAvailableError(error)
+        self._lent[row >> 3] ^= 1 << (row & 7)
+
+    def lend_book(self, isbn):
+        self._set_lent(isbn, True, "Book is already lent.")
+
+    def return_book(self, isbn):
+        self._set_lent(isbn, False, "Book was not lent.")
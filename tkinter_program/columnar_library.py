@@ -0,0 +1,242 @@
+# columnar_library.py
+#
+# Library backend that keeps the catalog in flat columns instead of one
+# object per book: titles and ISBNs as UTF-8 blobs with offset arrays,
+# authors as an interned string table, status as bitmaps. Book/EBook
+# objects are only built when a caller asks for them, and they are detached
+# copies: change status through the library.
+
+from array import array
+import math
+
+from book_library import Book, EBook, BookNotAvailableError, _normalize, write_books
+
+class _StringTable:
+    def __init__(self):
+        self.strings = []
+        self.ids = {}
+
+    def intern(self, value):
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+class _StringColumn:
+    # One UTF-8 blob per column; row i spans offsets[i]:offsets[i + 1]
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array("Q", [0])
+
+    def append(self, encoded):
+        self.data += encoded
+        self.offsets.append(len(self.data))
+
+    def __getitem__(self, row):
+        return self.data[self.offsets[row]:self.offsets[row + 1]].decode("utf-8")
+
+class _Bitmap:
+    def __init__(self):
+        self.bits = bytearray()
+
+    def grow(self, row):
+        if row >> 3 >= len(self.bits):
+            self.bits.append(0)
+
+    def __getitem__(self, row):
+        return self.bits[row >> 3] >> (row & 7) & 1
+
+    def set(self, row):
+        self.bits[row >> 3] |= 1 << (row & 7)
+
+    def clear(self, row):
+        self.bits[row >> 3] &= ~(1 << (row & 7)) & 0xFF
+
+class _StatusView:
+    def __init__(self, library, lent):
+        self._library = library
+        self._lent = lent
+
+    def __len__(self):
+        library = self._library
+        return library._lent_count if self._lent else len(library) - library._lent_count
+
+    def __iter__(self):
+        return self._library._iter_rows(self._lent)
+
+class ColumnarLibrary:
+    def __init__(self):
+        self._titles = _StringColumn()
+        self._isbns = _StringColumn()
+        self._author_names = _StringTable()  # authors repeat, so they are interned
+        self._authors = array("L")
+        self._sizes = array("d")  # NaN for printed books
+        self._lent_bits = _Bitmap()
+        self._live_bits = _Bitmap()  # cleared when a row is removed
+        self._rows = {}  # ISBN -> row
+        self._by_author = {}  # normalized author -> list of rows
+        self._lent_count = 0
+        self.version = 0  # bumped on every mutation
+
+    def _book(self, row):
+        title = self._titles[row]
+        author = self._author_names.strings[self._authors[row]]
+        isbn = self._isbns[row]
+        size = self._sizes[row]
+        book = Book(title, author, isbn) if math.isnan(size) else EBook(title, author, isbn, size)
+        book.is_lent = bool(self._lent_bits[row])
+        return book
+
+    def _iter_rows(self, lent=None):
+        live, lent_bits = self._live_bits, self._lent_bits
+        for row in range(len(self._authors)):
+            if live[row] and (lent is None or lent_bits[row] == lent):
+                yield self._book(row)
+
+    @property
+    def books(self):
+        return list(self._iter_rows())
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, isbn):
+        return isbn in self._rows
+
+    def __iter__(self):
+        return self._iter_rows(lent=False)
+
+    def available(self):
+        return _StatusView(self, lent=False)
+
+    def lent(self):
+        return _StatusView(self, lent=True)
+
+    def get_book(self, isbn):
+        row = self._rows.get(isbn)
+        return None if row is None else self._book(row)
+
+    def add_book(self, book):
+        if book.isbn in self._rows:
+            raise ValueError("Book with this ISBN already exists.")
+        # Convert every field before touching a column, so a bad one cannot
+        # leave the columns different lengths
+        title = book.title.encode("utf-8")
+        isbn = book.isbn.encode("utf-8")
+        author_key = _normalize(book.author)
+        size = float(book.size) if isinstance(book, EBook) else math.nan
+        row = len(self._authors)
+        self._titles.append(title)
+        self._isbns.append(isbn)
+        self._authors.append(self._author_names.intern(book.author))
+        self._sizes.append(size)
+        self._lent_bits.grow(row)
+        self._live_bits.grow(row)
+        self._live_bits.set(row)
+        if book.is_lent:
+            self._lent_bits.set(row)
+            self._lent_count += 1
+        self._rows[book.isbn] = row
+        self._by_author.setdefault(author_key, []).append(row)
+        self.version += 1
+
+    def remove_book(self, isbn):
+        row = self._rows.pop(isbn, None)
+        if row is None:
+            raise ValueError("Book not found.")
+        self._live_bits.clear(row)
+        if self._lent_bits[row]:
+            self._lent_bits.clear(row)
+            self._lent_count -= 1
+        key = _normalize(self._author_names.strings[self._authors[row]])
+        same_author = self._by_author[key]
+        same_author.remove(row)
+        if not same_author:
+            del self._by_author[key]
+        self.version += 1
+
+    def lend_book(self, isbn):
+        row = self._rows.get(isbn)
+        if row is None:
+            raise BookNotAvailableError("Book not found.")
+        if self._lent_bits[row]:
+            raise BookNotAvailableError("Book is already lent.")
+        self._lent_bits.set(row)
+        self._lent_count += 1
+        self.version += 1
+
+    def return_book(self, isbn):
+        row = self._rows.get(isbn)
+        if row is None:
+            raise BookNotAvailableError("Book not found.")
+        if not self._lent_bits[row]:
+            raise BookNotAvailableError("Book was not lent.")
+        self._lent_bits.clear(row)
+        self._lent_count -= 1
+        self.version += 1
+
+    # All-or-nothing like Library.lend_many
+    def lend_many(self, isbns):
+        return self._set_many(isbns, True, "Book is already lent.")
+
+    def return_many(self, isbns):
+        return self._set_many(isbns, False, "Book was not lent.")
+
+    def _set_many(self, isbns, lent, error):
+        results, rows = {}, []
+        for isbn in isbns:
+            row = self._rows.get(isbn)
+            if isbn in results:
+                results[isbn] = "ISBN appears more than once."
+            elif row is None:
+                results[isbn] = "Book not found."
+            elif self._lent_bits[row] == lent:
+                results[isbn] = error
+            else:
+                results[isbn] = None
+                rows.append(row)
+        if any(results.values()):
+            return results
+        for row in rows:
+            (self._lent_bits.set if lent else self._lent_bits.clear)(row)
+        self._lent_count += len(rows) if lent else -len(rows)
+        self.version += 1
+        return results
+
+    def books_by_author(self, author):
+        rows = list(self._by_author.get(_normalize(author), ()))
+        return (self._book(row) for row in rows)
+
+    def export(self, fp, format="csv", available_only=False, author=None):
+        if author is not None:
+            books = self.books_by_author(author)
+            if available_only:
+                books = (book for book in books if not book.is_lent)
+        else:
+            books = self._iter_rows(lent=False if available_only else None)
+        write_books(books, fp, format)
+
+    def stat_columns(self):
+        # The raw columns, for bulk aggregation without building a Book per
+        # row (see library_stats). Removed rows are still present: mask them
+        # with `live`. live and lent are bitmaps, row i in bit i % 8 of byte
+        # i // 8; sizes are NaN for printed books; authors are ids into
+        # author_names, which are normalized.
+        return {
+            "rows": len(self._authors),
+            "live": bytes(self._live_bits.bits),
+            "lent": bytes(self._lent_bits.bits),
+            "sizes": self._sizes,
+            "authors": self._authors,
+            "author_names": [_normalize(name) for name in self._author_names.strings],
+        }
+
+    def compact(self):
+        # Drop removed rows and strings that are no longer referenced
+        books = self.books
+        version = self.version
+        self.__init__()
+        for book in books:
+            self.add_book(book)
+        self.version = version + 1
@@ -0,0 +1,136 @@
+# concurrent_library.py
+#
+# Library that can be shared between threads. Circulation on a book takes
+# only the lock of the stripe its ISBN hashes to, so threads lending or
+# returning different books rarely wait on each other. Adding and removing
+# books also rebuilds the shared title, author and full-text indexes, so
+# those take the catalog lock as well, as do the searches that read them.
+#
+# Lock order: catalog lock first, then stripe locks in ascending order.
+# Change events are held back until a mutation has released its locks, so
+# listeners run outside them and may call back into the library.
+
+from contextlib import ExitStack, contextmanager
+import itertools
+import threading
+
+from book_library import Library
+
+class ConcurrentLibrary(Library):
+    def __init__(self, stripes=64):
+        self._versions = itertools.count(1)
+        super().__init__()
+        self._catalog_lock = threading.RLock()
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        self._pending = threading.local()  # events of this thread's current mutation
+
+    @property
+    def version(self):
+        return self._version
+
+    @version.setter
+    def version(self, value):
+        # Library bumps the version with `self.version += 1`, which could
+        # hand out the same number twice under concurrent bumps; every bump
+        # draws a fresh number instead
+        self._version = next(self._versions)
+
+    def _locked(self, isbns):
+        # Hold the stripe locks for every ISBN given, in ascending order
+        stack = ExitStack()
+        for i in sorted({hash(isbn) % len(self._stripes) for isbn in isbns}):
+            stack.enter_context(self._stripes[i])
+        return stack
+
+    @contextmanager
+    def _deferred_events(self):
+        # Enter before taking locks: events raised inside are emitted on exit,
+        # after the locks are released
+        events = self._pending.events = []
+        try:
+            yield
+        finally:
+            self._pending.events = None
+        for event, book in events:
+            super()._emit(event, book)
+
+    def _emit(self, event, book):
+        events = getattr(self._pending, "events", None)
+        if events is None:
+            super()._emit(event, book)
+        else:
+            events.append((event, book))
+
+    def _locked_all(self):
+        stack = ExitStack()
+        stack.enter_context(self._catalog_lock)
+        for lock in self._stripes:
+            stack.enter_context(lock)
+        return stack
+
+    def add_book(self, book):
+        with self._deferred_events(), self._catalog_lock, self._locked([book.isbn]):
+            super().add_book(book)
+
+    def add_books(self, books):
+        books = list(books)
+        with self._deferred_events(), self._catalog_lock, self._locked([book.isbn for book in books]):
+            super().add_books(books)
+
+    def remove_book(self, isbn):
+        with self._deferred_events(), self._catalog_lock, self._locked([isbn]):
+            super().remove_book(isbn)
+
+    def lend_book(self, isbn):
+        with self._deferred_events(), self._locked([isbn]):
+            super().lend_book(isbn)
+
+    def return_book(self, isbn):
+        with self._deferred_events(), self._locked([isbn]):
+            super().return_book(isbn)
+
+    def lend_many(self, isbns):
+        isbns = list(isbns)
+        with self._deferred_events(), self._locked(isbns):
+            return super().lend_many(isbns)
+
+    def return_many(self, isbns):
+        isbns = list(isbns)
+        with self._deferred_events(), self._locked(isbns):
+            return super().return_many(isbns)
+
+    def available(self):
+        # Snapshots: the live views change size while other threads import
+        # or circulate, which breaks a reader iterating them
+        with self._catalog_lock:
+            return list(super().available())
+
+    def lent(self):
+        with self._catalog_lock:
+            return list(super().lent())
+
+    def page(self, after=None, limit=50, filter=None, author=None):
+        with self._catalog_lock:
+            return super().page(after, limit, filter, author)
+
+    def books_by_author(self, author):
+        with self._catalog_lock:
+            return super().books_by_author(author)
+
+    def similar_authors(self, name, limit=5, threshold=0.4):
+        with self._catalog_lock:
+            return super().similar_authors(name, limit, threshold)
+
+    def titles_starting_with(self, prefix, limit=10):
+        with self._catalog_lock:
+            return super().titles_starting_with(prefix, limit)
+
+    def search(self, query, limit=None):
+        with self._catalog_lock:
+            return super().search(query, limit)
+
+    def export(self, fp, format="csv", available_only=False, author=None):
+        # The partitions change on every lend, so circulation waits for the
+        # export to finish
+        with self._locked_all():
+            super().export(fp, format, available_only, author)
@@ -0,0 +1,143 @@
+# importer.py
+#
+# Bulk import of books from CSV or JSON Lines files. Rows are read through
+# generators and handed to the library in batches, so memory stays bounded
+# by the batch size whatever the file size. Each row needs title, author
+# and isbn; a positive size (MB) makes it an EBook, and a true lent flag
+# (as written by Library.export) marks it lent.
+
+import csv
+import json
+import os
+import time
+
+from book_library import Book, EBook
+
+MAX_ERRORS = 100  # rejected rows beyond this are counted but not kept
+
+class ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.rejected = 0
+        self.errors = []  # (line number, message), at most MAX_ERRORS
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return (self.imported + self.rejected) / self.seconds if self.seconds else 0.0
+
+    def reject(self, line, message):
+        self.rejected += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append((line, message))
+
+    def __str__(self):
+        return (f"Imported {self.imported} books, rejected {self.rejected} rows "
+                f"in {self.seconds:.2f}s ({self.rows_per_second:.0f} rows/s)")
+
+# Readers yield one (row dict, error message) pair per input line
+
+def read_csv(fp):
+    for row in csv.DictReader(fp):
+        yield row, None
+
+def read_jsonl(fp):
+    for line in fp:
+        if not line.strip():
+            yield None, None
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield None, f"Invalid JSON: {e}"
+            continue
+        yield (row, None) if isinstance(row, dict) else (None, "Expected a JSON object.")
+
+READERS = {
+    "csv": read_csv,
+    "jsonl": read_jsonl,
+}
+
+def make_book(row):
+    # Build a Book or EBook from a row dict, raising ValueError if invalid
+    title, author, isbn = (str(row.get(field) or "").strip() for field in ("title", "author", "isbn"))
+    if not title or not author or not isbn:
+        raise ValueError("Title, Author, and ISBN are required.")
+    size = row.get("size")
+    if size is None or str(size).strip() == "":
+        book = Book(title, author, isbn)
+    else:
+        try:
+            size = float(size)
+        except (TypeError, ValueError):
+            size = 0.0  # e.g. a list or object from JSON
+        if not size > 0:
+            raise ValueError("Download size must be a positive number.")
+        book = EBook(title, author, isbn, size)
+    # CSV holds "True"/"False", JSON Lines true/false
+    book.is_lent = str(row.get("lent")).strip().lower() in ("true", "1")
+    return book
+
+def import_books(library, path, format=None, batch_size=10_000, progress=None):
+    # format defaults to the file extension; progress(rows read) is called
+    # after every batch
+    format = format or os.path.splitext(path)[1].lstrip(".").lower()
+    if format not in READERS:
+        raise ValueError(f"Unsupported import format: {format!r}")
+    add_books = getattr(library, "add_books", None)
+    report = ImportReport()
+    start = time.perf_counter()
+    batch, batch_lines, batch_isbns = [], [], set()
+    first_line = 2 if format == "csv" else 1
+
+    def add_each():
+        # A book added since its row was checked (e.g. from another thread)
+        # is rejected on its own instead of failing the whole batch
+        for book, line in zip(batch, batch_lines):
+            try:
+                library.add_book(book)
+            except ValueError as e:
+                report.reject(line, str(e))
+            else:
+                report.imported += 1
+
+    def flush():
+        if add_books is None:
+            add_each()
+        else:
+            try:
+                add_books(batch)
+            except ValueError:
+                add_each()
+            else:
+                report.imported += len(batch)
+        batch.clear()
+        batch_lines.clear()
+        batch_isbns.clear()
+        if progress is not None:
+            progress(report.imported + report.rejected)
+
+    # utf-8-sig drops the byte order mark spreadsheet exports start with
+    with open(path, newline="", encoding="utf-8-sig") as fp:
+        for line, (row, error) in enumerate(READERS[format](fp), first_line):
+            if row is None:
+                if error:
+                    report.reject(line, error)
+                continue
+            try:
+                book = make_book(row)
+            except ValueError as e:
+                report.reject(line, str(e))
+                continue
+            if book.isbn in batch_isbns or book.isbn in library:
+                report.reject(line, "A book with this ISBN already exists.")
+                continue
+            batch.append(book)
+            batch_lines.append(line)
+            batch_isbns.add(book.isbn)
+            if len(batch) >= batch_size:
+                flush()
+    if batch:
+        flush()
+    report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,189 @@
+# journal_library.py
+#
+# Library that survives restarts by appending every mutation to a journal
+# instead of rewriting the catalog. Each record is flushed to the OS as it
+# is written, so a process crash loses nothing; fsyncs are grouped, with a
+# timer covering a group that stops filling up. Every
+# `snapshot_every` records the catalog is written to a snapshot and a fresh
+# journal is started, so recovery replays at most that many records.
+#
+# Files in `directory`:
+#   snapshot.jsonl    header {"generation": g}, then one book per line
+#   journal-<g>.log   mutations made after snapshot generation g
+
+import json
+import os
+import threading
+
+from book_library import Book, EBook, Library
+
+_SNAPSHOT = "snapshot.jsonl"
+
+def _dumps(record):
+    return json.dumps(record, separators=(",", ":"))
+
+def _book_record(book):
+    size = book.size if isinstance(book, EBook) else None
+    return [book.title, book.author, book.isbn, size, book.is_lent]
+
+def _record_book(record):
+    title, author, isbn, size, is_lent = record
+    book = Book(title, author, isbn) if size is None else EBook(title, author, isbn, size)
+    book.is_lent = is_lent
+    return book
+
+class JournaledLibrary(Library):
+    def __init__(self, directory, group_size=64, group_delay=0.05, snapshot_every=100_000):
+        super().__init__()
+        self.directory = directory
+        self.group_size = group_size  # fsync after this many records...
+        self.group_delay = group_delay  # ...or once the oldest unsynced one is this old (seconds)
+        self.snapshot_every = snapshot_every
+        self._unsynced = 0
+        self._timer = None  # fsyncs a group that is still open after group_delay
+        self._lock = threading.RLock()  # the timer thread writes to the journal too
+        os.makedirs(directory, exist_ok=True)
+        self.generation = self._recover()
+        self._journal = open(self._journal_path(self.generation), "a", encoding="utf-8")
+
+    def _journal_path(self, generation):
+        return os.path.join(self.directory, f"journal-{generation}.log")
+
+    def _recover(self):
+        generation = 0
+        try:
+            with open(os.path.join(self.directory, _SNAPSHOT), encoding="utf-8") as snapshot:
+                generation = json.loads(next(snapshot))["generation"]
+                Library.add_books(self, (_record_book(json.loads(line)) for line in snapshot))
+        except FileNotFoundError:
+            pass
+        self._records = 0
+        try:
+            with open(self._journal_path(generation), "r+b") as journal:
+                good = 0
+                for line in journal:
+                    try:
+                        op, *args = json.loads(line)
+                    except ValueError:
+                        break
+                    if not line.endswith(b"\n"):
+                        break
+                    self._replay(op, args)
+                    self._records += 1
+                    good += len(line)
+                journal.truncate(good)  # drop a torn final write from a crash
+        except FileNotFoundError:
+            pass
+        return generation
+
+    def _replay(self, op, args):
+        if op == "add":
+            Library.add_book(self, _record_book(args))
+        elif op == "add_many":
+            Library.add_books(self, [_record_book(record) for record in args])
+        elif op == "remove":
+            Library.remove_book(self, *args)
+        elif op == "lend":
+            Library.lend_book(self, *args)
+        elif op == "return":
+            Library.return_book(self, *args)
+        elif op == "lend_many":
+            Library.lend_many(self, args)
+        elif op == "return_many":
+            Library.return_many(self, args)
+
+    def _append(self, *record):
+        with self._lock:
+            self._journal.write(_dumps(record) + "\n")
+            self._journal.flush()
+            self._unsynced += 1
+            self._records += 1
+            if self._unsynced >= self.group_size:
+                self.sync()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.group_delay, self._sync_group)
+                self._timer.daemon = True
+                self._timer.start()
+            if self._records >= self.snapshot_every:
+                self.snapshot()
+
+    def _sync_group(self):
+        with self._lock:
+            if not self._journal.closed:
+                self.sync()
+
+    def sync(self):
+        # Make every record written so far durable
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._unsynced:
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+                self._unsynced = 0
+
+    def snapshot(self):
+        # Write the whole catalog under the next generation, then drop the
+        # journal it replaces. Until the rename, recovery still uses the old
+        # snapshot and journal.
+        with self._lock:
+            self.sync()
+            generation = self.generation + 1
+            path = os.path.join(self.directory, _SNAPSHOT)
+            with open(path + ".tmp", "w", encoding="utf-8") as snapshot:
+                snapshot.write(_dumps({"generation": generation}) + "\n")
+                snapshot.writelines(_dumps(_book_record(book)) + "\n" for book in self._books.values())
+                snapshot.flush()
+                os.fsync(snapshot.fileno())
+            journal = open(self._journal_path(generation), "w", encoding="utf-8")
+            os.replace(path + ".tmp", path)
+            self._journal.close()
+            os.remove(self._journal_path(self.generation))
+            self._journal = journal
+            self.generation = generation
+            self._records = 0
+
+    def close(self):
+        with self._lock:
+            self.sync()
+            self._journal.close()
+
+    def add_book(self, book):
+        super().add_book(book)
+        self._append("add", *_book_record(book))
+
+    def add_books(self, books):
+        # One record for the whole batch: a snapshot taken between per-book
+        # records would already hold the rest of the batch
+        books = list(books)
+        super().add_books(books)
+        if books:
+            self._append("add_many", *(_book_record(book) for book in books))
+
+    def remove_book(self, isbn):
+        super().remove_book(isbn)
+        self._append("remove", isbn)
+
+    def lend_book(self, isbn):
+        super().lend_book(isbn)
+        self._append("lend", isbn)
+
+    def return_book(self, isbn):
+        super().return_book(isbn)
+        self._append("return", isbn)
+
+    def lend_many(self, isbns):
+        results = super().lend_many(isbns)
+        self._append_batch("lend_many", results)
+        return results
+
+    def return_many(self, isbns):
+        results = super().return_many(isbns)
+        self._append_batch("return_many", results)
+        return results
+
+    def _append_batch(self, op, results):
+        # One record for the whole batch, so replay is all-or-nothing too
+        if results and not any(results.values()):
+            self._append(op, *results)
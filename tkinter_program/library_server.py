@@ -0,0 +1,240 @@
+# library_server.py
+#
+# HTTP/JSON circulation service so several branches can share one catalog.
+# Runs on the standard library only: ThreadingHTTPServer speaking HTTP/1.1
+# (connections are kept alive) in front of a ConcurrentLibrary.
+#
+#   GET    /books?after=<cursor>&limit=50&status=available|lent&author=...
+#          -> {"books": [...], "next": <cursor for the next page, or null>}
+#   GET    /books.jsonl?status=available&author=...   (streamed, chunked)
+#   GET    /books/<isbn>
+#   POST   /books                {"title", "author", "isbn", "size"?}
+#   DELETE /books/<isbn>
+#   POST   /books/<isbn>/lend
+#   POST   /books/<isbn>/return
+#   GET    /search?q=...&limit=20
+#
+#   python library_server.py --port 8080 --import books.csv
+
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from book_library import BookNotAvailableError, EBook, write_books
+from concurrent_library import ConcurrentLibrary
+from importer import import_books, make_book
+
+MAX_LIMIT = 1000
+
+def book_json(book):
+    return {"title": book.title, "author": book.author, "isbn": book.isbn,
+            "size": book.size if isinstance(book, EBook) else None, "lent": book.is_lent}
+
+class _ChunkedWriter:
+    # Text file interface that sends each buffered write as an HTTP chunk
+    def __init__(self, wfile, buffer_size=64 * 1024):
+        self._wfile = wfile
+        self._buffer = []
+        self._buffered = 0
+        self._buffer_size = buffer_size
+
+    def write(self, text):
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self._buffer_size:
+            self.flush()
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        if self._buffer:
+            data = "".join(self._buffer).encode("utf-8")
+            self._wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self._buffer, self._buffered = [], 0
+
+    def close(self):
+        self.flush()
+        self._wfile.write(b"0\r\n\r\n")
+
+class LibraryRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    library = None  # set by make_server
+
+    def log_message(self, format, *args):
+        pass  # one line per request would dominate a load test
+
+    def send_response(self, code, message=None):
+        self._responded = True
+        super().send_response(code, message)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        self._send_json(status, {"error": message})
+
+    def _read_body(self):
+        # Every request's body is consumed, used or not: on a kept-alive
+        # connection unread bytes would be parsed as the next request
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            return None
+        return self.rfile.read(length)
+
+    def _read_json(self):
+        return json.loads(self.body or b"{}")
+
+    def _route(self, method):
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        self._responded = False
+        self.body = self._read_body()
+        if self.body is None:
+            self.close_connection = True
+            self._send_error(400, "Invalid Content-Length.")
+            return
+        try:
+            handler, args = self._resolve(method, parts)
+            if handler is None:
+                self._send_error(404, "No such endpoint.")
+            else:
+                handler(query, *args)
+        except BookNotAvailableError as e:
+            self._send_error(404 if str(e) == "Book not found." else 409, str(e))
+        except ValueError as e:
+            self._send_error(404 if str(e) == "Book not found." else 400, str(e))
+        except Exception as e:
+            # Answer rather than drop a kept-alive connection, unless a
+            # response was already under way
+            self.log_error("Error handling %s %s: %r", method, self.path, e)
+            if self._responded:
+                self.close_connection = True
+            else:
+                self._send_error(500, "Internal server error.")
+
+    def _resolve(self, method, parts):
+        if parts == ["books"]:
+            return {"GET": self.list_books, "POST": self.add_book}.get(method), ()
+        if parts == ["books.jsonl"] and method == "GET":
+            return self.stream_books, ()
+        if parts == ["search"] and method == "GET":
+            return self.search, ()
+        if len(parts) == 2 and parts[0] == "books":
+            return {"GET": self.get_book, "DELETE": self.remove_book}.get(method), (parts[1],)
+        if len(parts) == 3 and parts[0] == "books" and method == "POST":
+            return {"lend": self.lend_book, "return": self.return_book}.get(parts[2]), (parts[1],)
+        return None, ()
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_DELETE(self):
+        self._route("DELETE")
+
+    def _page(self, query, after, limit):
+        status = query.get("status")
+        filter = None if status is None else (lambda book: book.is_lent == (status == "lent"))
+        return self.library.page(after, limit, filter, query.get("author"))
+
+    def list_books(self, query):
+        after = int(query["after"]) if "after" in query else None
+        limit = max(1, min(int(query.get("limit", 50)), MAX_LIMIT))
+        books, cursor = self._page(query, after, limit)
+        self._send_json(200, {"books": [book_json(book) for book in books], "next": cursor})
+
+    def stream_books(self, query):
+        # Page by page, so the library is not held locked while a slow
+        # client reads
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        writer = _ChunkedWriter(self.wfile)
+        cursor = None
+        while True:
+            books, cursor = self._page(query, cursor, MAX_LIMIT)
+            write_books(books, writer, "jsonl")
+            if cursor is None:
+                break
+        writer.close()
+
+    def get_book(self, query, isbn):
+        book = self.library.get_book(isbn)
+        if book is None:
+            raise ValueError("Book not found.")
+        self._send_json(200, book_json(book))
+
+    def add_book(self, query):
+        try:
+            row = self._read_json()
+        except ValueError:
+            raise ValueError("Request body must be JSON.") from None
+        if not isinstance(row, dict):
+            raise ValueError("Request body must be a JSON object.")
+        book = make_book(row)
+        try:
+            self.library.add_book(book)
+        except ValueError as e:
+            self._send_error(409, str(e))
+            return
+        self._send_json(201, book_json(book))
+
+    def remove_book(self, query, isbn):
+        self.library.remove_book(isbn)
+        self._send_json(200, {"isbn": isbn, "removed": True})
+
+    def lend_book(self, query, isbn):
+        self.library.lend_book(isbn)
+        self._send_json(200, {"isbn": isbn, "lent": True})
+
+    def return_book(self, query, isbn):
+        self.library.return_book(isbn)
+        self._send_json(200, {"isbn": isbn, "lent": False})
+
+    def search(self, query):
+        limit = max(1, min(int(query.get("limit", 20)), MAX_LIMIT))
+        books = self.library.search(query.get("q", ""), limit)
+        self._send_json(200, {"books": [book_json(book) for book in books]})
+
+def make_server(library, host="127.0.0.1", port=8080):
+    handler = type("Handler", (LibraryRequestHandler,), {"library": library})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Library circulation service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--import", dest="import_path", help="CSV or JSONL file to load at startup")
+    args = parser.parse_args()
+    library = ConcurrentLibrary()
+    if args.import_path:
+        print(import_books(library, args.import_path))
+    server = make_server(library, args.host, args.port)
+    print(f"Serving on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# library_stats.py
+#
+# Catalog reporting on NumPy arrays. The catalog is copied into arrays once
+# per library version, and every aggregate is cached until the library's
+# version counter moves. Needs numpy (see requirements.txt), which nothing
+# else in the program does.
+
+import numpy as np
+
+from book_library import EBook, _normalize
+from columnar_library import ColumnarLibrary
+
+class LibraryStats:
+    def __init__(self, library):
+        self.library = library
+        self._version = None
+        self._cache = {}
+
+    def _snapshot(self):
+        if self._version != self.library.version:
+            self._cache = {"arrays": _snapshot(self.library)}
+            self._version = self.library.version
+        return self._cache["arrays"]
+
+    def _cached(self, key, compute):
+        arrays = self._snapshot()
+        if key not in self._cache:
+            self._cache[key] = compute(*arrays)
+        return self._cache[key]
+
+    def total_books(self):
+        return self._cached("total_books", lambda sizes, lent, authors: int(sizes.size))
+
+    def percent_lent(self):
+        def compute(sizes, lent, authors):
+            return float(lent.mean() * 100) if lent.size else 0.0
+        return self._cached("percent_lent", compute)
+
+    def ebook_count(self):
+        return self._cached("ebook_count", lambda sizes, lent, authors: int(np.count_nonzero(~np.isnan(sizes))))
+
+    def total_ebook_size(self):
+        # Total eBook storage in MB
+        return self._cached("total_ebook_size", lambda sizes, lent, authors: float(np.nansum(sizes)))
+
+    def size_histogram(self, bins=10):
+        def compute(sizes, lent, authors):
+            return np.histogram(sizes[~np.isnan(sizes)], bins=bins)
+        # bins may be an array of edges, which is not hashable
+        key = bins if np.isscalar(bins) else tuple(np.ravel(bins).tolist())
+        return self._cached(("size_histogram", key), compute)
+
+    def author_counts(self):
+        # Normalized author name -> number of books
+        def compute(sizes, lent, authors):
+            names, counts = np.unique(authors, return_counts=True)
+            return dict(zip(names.tolist(), counts.tolist()))
+        return self._cached("author_counts", compute)
+
+def _snapshot(library):
+    # ColumnarLibrary already stores its columns as arrays, so view them
+    # directly instead of materializing a Book per row
+    if isinstance(library, ColumnarLibrary):
+        columns = library.stat_columns()
+        rows = columns["rows"]
+        live = np.unpackbits(np.frombuffer(columns["live"], dtype=np.uint8), count=rows, bitorder="little").astype(bool)
+        lent = np.unpackbits(np.frombuffer(columns["lent"], dtype=np.uint8), count=rows, bitorder="little").astype(bool)
+        sizes = np.frombuffer(columns["sizes"], dtype=np.float64)
+        names = np.array(columns["author_names"] or [""], dtype=str)
+        authors = names[np.frombuffer(columns["authors"], dtype=np.dtype(f"u{columns['authors'].itemsize}"))]
+        return sizes[live], lent[live], authors[live]
+
+    books = library.books
+    sizes = np.array([book.size if isinstance(book, EBook) else np.nan for book in books], dtype=np.float64)
+    lent = np.array([book.is_lent for book in books], dtype=bool)
+    authors = np.array([_normalize(book.author) for book in books], dtype=str)
+    return sizes, lent, authors
@@ -0,0 +1,92 @@
+# load_test.py
+#
+# Load test for library_server.py. Each client thread keeps one HTTP/1.1
+# connection open and loops over lend, return, lookup and search requests
+# on its own slice of the catalog, then the script reports throughput and
+# latency percentiles.
+#
+#   python load_test.py --clients 16 --seconds 10            (own server)
+#   python load_test.py --host 127.0.0.1 --port 8080         (running one)
+
+import argparse
+from http.client import HTTPConnection
+import json
+import threading
+import time
+
+from book_library import Book
+from concurrent_library import ConcurrentLibrary
+from library_server import make_server
+
+def client(host, port, isbns, deadline, latencies, errors):
+    connection = HTTPConnection(host, port)
+    requests = []
+    for isbn in isbns:
+        requests += [("POST", f"/books/{isbn}/lend"), ("GET", f"/books/{isbn}"),
+                     ("POST", f"/books/{isbn}/return"), ("GET", f"/search?q=title+{isbn.split('-')[1]}")]
+    i = 0
+    while time.perf_counter() < deadline:
+        method, path = requests[i % len(requests)]
+        start = time.perf_counter()
+        connection.request(method, path)
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status >= 400:
+            errors.append((method, path, response.status))
+        i += 1
+    connection.close()
+
+def seed(host, port, books):
+    connection = HTTPConnection(host, port)
+    for i in range(books):
+        body = json.dumps({"title": f"Title {i}", "author": f"Author {i % 100}", "isbn": f"load-{i}"})
+        connection.request("POST", "/books", body, {"Content-Type": "application/json"})
+        connection.getresponse().read()
+    connection.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the library service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="port of a running server; omit to start one")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--books", type=int, default=10_000)
+    args = parser.parse_args()
+
+    server = None
+    if args.port is None:
+        library = ConcurrentLibrary()
+        library.add_books(Book(f"Title {i}", f"Author {i % 100}", f"load-{i}") for i in range(args.books))
+        server = make_server(library, args.host, 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_port
+    else:
+        port = args.port
+        seed(args.host, port, args.books)
+
+    latencies, errors = [], []
+    deadline = time.perf_counter() + args.seconds
+    threads = []
+    for c in range(args.clients):
+        isbns = [f"load-{i}" for i in range(c, args.books, args.clients)]
+        threads.append(threading.Thread(target=client, args=(args.host, port, isbns, deadline, latencies, errors)))
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+
+    latencies.sort()
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1e3
+    print(f"{len(latencies)} requests from {args.clients} clients in {elapsed:.1f}s: {len(latencies) / elapsed:.0f} req/s")
+    print(f"  latency p50 {percentile(0.50):.2f} ms, p99 {percentile(0.99):.2f} ms, max {latencies[-1] * 1e3:.2f} ms")
+    print(f"  {len(errors)} error responses")
+
+if __name__ == "__main__":
+    main()
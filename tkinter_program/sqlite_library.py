@@ -0,0 +1,294 @@
+# sqlite_library.py
+#
+# Library backend stored in an SQLite database, so the catalog survives
+# restarts. ISBN and author lookups go through B-tree indexes, search
+# through an FTS5 index and similar_authors through a table of author
+# trigrams, all kept up to date in the transactions that change books. Like
+# ColumnarLibrary, the Book/EBook objects it hands out are detached copies:
+# change status through the library.
+
+import json
+import math
+import sqlite3
+
+from book_library import Book, EBook, BookNotAvailableError, _normalize, _token_weights, _tokens, _trigrams, write_books
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,
+    isbn TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    author_key TEXT NOT NULL,
+    title_key TEXT NOT NULL,
+    size REAL,
+    is_lent INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS books_author_key ON books (author_key);
+CREATE INDEX IF NOT EXISTS books_title_key ON books (title_key);
+CREATE INDEX IF NOT EXISTS books_lent ON books (is_lent, id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5 (
+    title, author, content = 'books', content_rowid = 'id',
+    tokenize = "unicode61 remove_diacritics 0 tokenchars '_'"
+);
+CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books BEGIN
+    INSERT INTO books_fts (rowid, title, author) VALUES (new.id, new.title, new.author);
+END;
+CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books BEGIN
+    INSERT INTO books_fts (books_fts, rowid, title, author) VALUES ('delete', old.id, old.title, old.author);
+END;
+
+-- One row per distinct author_key; trigrams are added by the library
+CREATE TABLE IF NOT EXISTS authors (
+    author_key TEXT PRIMARY KEY,
+    trigram_count INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS author_trigrams (
+    trigram TEXT NOT NULL,
+    author_key TEXT NOT NULL,
+    PRIMARY KEY (trigram, author_key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS author_trigrams_author ON author_trigrams (author_key);
+CREATE TRIGGER IF NOT EXISTS books_author_delete AFTER DELETE ON books
+WHEN NOT EXISTS (SELECT 1 FROM books WHERE author_key = old.author_key) BEGIN
+    DELETE FROM author_trigrams WHERE author_key = old.author_key;
+    DELETE FROM authors WHERE author_key = old.author_key;
+END;
+"""
+
+# Statements are kept constant so sqlite3's statement cache reuses them
+_COLUMNS = "title, author, isbn, size, is_lent"
+_INSERT = "INSERT INTO books (isbn, title, author, author_key, title_key, size, is_lent) VALUES (?, ?, ?, ?, ?, ?, ?)"
+_SELECT_ALL = f"SELECT {_COLUMNS} FROM books ORDER BY id"
+_SELECT_STATUS = f"SELECT {_COLUMNS} FROM books WHERE is_lent = ? ORDER BY id"
+_SELECT_ISBN = f"SELECT {_COLUMNS} FROM books WHERE isbn = ?"
+_SELECT_AUTHOR = f"SELECT {_COLUMNS} FROM books WHERE author_key = ? ORDER BY id"
+_SELECT_AUTHOR_STATUS = f"SELECT {_COLUMNS} FROM books WHERE author_key = ? AND is_lent = ? ORDER BY id"
+_SELECT_TITLE_PREFIX = f"SELECT {_COLUMNS} FROM books WHERE title_key >= ? AND title_key < ? ORDER BY title_key, id LIMIT ?"
+_COUNT_ALL = "SELECT COUNT(*) FROM books"
+_COUNT_STATUS = "SELECT COUNT(*) FROM books WHERE is_lent = ?"
+_EXISTS = "SELECT 1 FROM books WHERE isbn = ?"
+_SELECT_LENT = "SELECT is_lent FROM books WHERE isbn = ?"
+_DELETE = "DELETE FROM books WHERE isbn = ?"
+_SET_LENT = "UPDATE books SET is_lent = ? WHERE isbn = ? AND is_lent = ?"
+_SEARCH = f"SELECT {_COLUMNS} FROM books WHERE id IN (SELECT rowid FROM books_fts WHERE books_fts MATCH ?) ORDER BY id"
+_AUTHOR_EXISTS = "SELECT 1 FROM authors WHERE author_key = ?"
+_INSERT_AUTHOR = "INSERT INTO authors (author_key, trigram_count) VALUES (?, ?)"
+_INSERT_TRIGRAM = "INSERT INTO author_trigrams (trigram, author_key) VALUES (?, ?)"
+_SELECT_AUTHOR_KEYS = "SELECT DISTINCT author_key FROM books"
+# Same ranking as Library.similar_authors: trigrams shared with the query,
+# then fewest trigrams overall; each author is shown as their first book has it
+_SELECT_SIMILAR_AUTHORS = """
+SELECT (SELECT author FROM books WHERE author_key = matches.author_key ORDER BY id LIMIT 1)
+FROM (
+    SELECT author_key, COUNT(*) AS common FROM author_trigrams
+    WHERE trigram IN (SELECT value FROM json_each(?))
+    GROUP BY author_key HAVING common >= ?
+) AS matches JOIN authors USING (author_key)
+ORDER BY common DESC, trigram_count, author_key LIMIT ?
+"""
+
+_FETCH_ROWS = 1000  # rows per fetchmany while streaming a query
+
+def _book(row):
+    title, author, isbn, size, is_lent = row
+    book = Book(title, author, isbn) if size is None else EBook(title, author, isbn, size)
+    book.is_lent = bool(is_lent)
+    return book
+
+def _row(book):
+    size = float(book.size) if isinstance(book, EBook) else None
+    return (book.isbn, book.title, book.author, _normalize(book.author), _normalize(book.title), size, int(book.is_lent))
+
+class _StatusView:
+    def __init__(self, library, lent):
+        self._library = library
+        self._lent = int(lent)
+
+    def __len__(self):
+        return self._library._conn.execute(_COUNT_STATUS, (self._lent,)).fetchone()[0]
+
+    def __iter__(self):
+        return self._library._query(_SELECT_STATUS, (self._lent,))
+
+class SqliteLibrary:
+    def __init__(self, path=":memory:", check_same_thread=True):
+        # check_same_thread=False lets another thread (e.g. AsyncLibrary's
+        # worker) use the connection; callers then serialize access themselves
+        self._conn = sqlite3.connect(path, cached_statements=64, check_same_thread=check_same_thread)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+        indexed = self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'authors'").fetchone()
+        self._conn.executescript(_SCHEMA)
+        if not indexed:
+            # A catalog written before the search indexes existed
+            with self._conn:
+                self._conn.execute("INSERT INTO books_fts (books_fts) VALUES ('rebuild')")
+                self._add_authors(key for key, in self._conn.execute(_SELECT_AUTHOR_KEYS).fetchall())
+        self.version = 0  # bumped on every mutation
+
+    def close(self):
+        self._conn.close()
+
+    def _query(self, sql, params=()):
+        # Executes now, then streams the rows in fetchmany batches
+        return self._stream(self._conn.execute(sql, params))
+
+    def _stream(self, cursor):
+        while True:
+            rows = cursor.fetchmany(_FETCH_ROWS)
+            if not rows:
+                return
+            yield from map(_book, rows)
+
+    def _add_authors(self, keys):
+        # Index the trigrams of every author key not indexed yet
+        for key in keys:
+            if self._conn.execute(_AUTHOR_EXISTS, (key,)).fetchone() is None:
+                trigrams = _trigrams(key)
+                self._conn.execute(_INSERT_AUTHOR, (key, len(trigrams)))
+                self._conn.executemany(_INSERT_TRIGRAM, ((trigram, key) for trigram in trigrams))
+
+    @property
+    def books(self):
+        return list(self._query(_SELECT_ALL))
+
+    def __len__(self):
+        return self._conn.execute(_COUNT_ALL).fetchone()[0]
+
+    def __contains__(self, isbn):
+        return self._conn.execute(_EXISTS, (isbn,)).fetchone() is not None
+
+    def __iter__(self):
+        return self._query(_SELECT_STATUS, (0,))
+
+    def available(self):
+        return _StatusView(self, lent=False)
+
+    def lent(self):
+        return _StatusView(self, lent=True)
+
+    def get_book(self, isbn):
+        row = self._conn.execute(_SELECT_ISBN, (isbn,)).fetchone()
+        return None if row is None else _book(row)
+
+    def add_book(self, book):
+        row = _row(book)
+        try:
+            with self._conn:
+                self._conn.execute(_INSERT, row)
+                self._add_authors((row[3],))
+        except sqlite3.IntegrityError:
+            raise ValueError("Book with this ISBN already exists.") from None
+        self.version += 1
+
+    def add_books(self, books, batch_size=10_000):
+        # Insert in batches, one transaction each; a duplicate ISBN rolls
+        # back only the batch it is in
+        batch = []
+        for book in books:
+            batch.append(_row(book))
+            if len(batch) == batch_size:
+                self._insert_batch(batch)
+                batch = []
+        if batch:
+            self._insert_batch(batch)
+
+    def _insert_batch(self, rows):
+        try:
+            with self._conn:
+                self._conn.executemany(_INSERT, rows)
+                self._add_authors({row[3] for row in rows})
+        except sqlite3.IntegrityError:
+            raise ValueError("Book with this ISBN already exists.") from None
+        self.version += 1
+
+    def remove_book(self, isbn):
+        with self._conn:
+            removed = self._conn.execute(_DELETE, (isbn,)).rowcount
+        if not removed:
+            raise ValueError("Book not found.")
+        self.version += 1
+
+    def _set_lent(self, isbn, lent, error):
+        with self._conn:
+            changed = self._conn.execute(_SET_LENT, (int(lent), isbn, int(not lent))).rowcount
+        if not changed:
+            raise BookNotAvailableError(error if isbn in self else "Book not found.")
+        self.version += 1
+
+    def lend_book(self, isbn):
+        self._set_lent(isbn, True, "Book is already lent.")
+
+    def return_book(self, isbn):
+        self._set_lent(isbn, False, "Book was not lent.")
+
+    # All-or-nothing like Library.lend_many: one transaction for the batch
+    def lend_many(self, isbns):
+        return self._set_many(isbns, True, "Book is already lent.")
+
+    def return_many(self, isbns):
+        return self._set_many(isbns, False, "Book was not lent.")
+
+    def _set_many(self, isbns, lent, error):
+        results = {}
+        with self._conn:
+            for isbn in isbns:
+                row = self._conn.execute(_SELECT_LENT, (isbn,)).fetchone()
+                if isbn in results:
+                    results[isbn] = "ISBN appears more than once."
+                elif row is None:
+                    results[isbn] = "Book not found."
+                elif row[0] == lent:
+                    results[isbn] = error
+                else:
+                    results[isbn] = None
+            if any(results.values()):
+                return results
+            self._conn.executemany(_SET_LENT, ((int(lent), isbn, int(not lent)) for isbn in results))
+        self.version += 1
+        return results
+
+    def books_by_author(self, author):
+        return self._query(_SELECT_AUTHOR, (_normalize(author),))
+
+    def search(self, query, limit=None):
+        tokens = set(_tokens(query))
+        if not tokens:
+            return []
+        # FTS5 narrows the catalog to books holding every token; they are
+        # then scored like Library.search so both backends rank alike
+        match = " ".join('"' + token.replace('"', '""') + '"' for token in tokens)
+        scored = []
+        for book in self._query(_SEARCH, (match,)):
+            weights = _token_weights(book)
+            if tokens <= weights.keys():
+                scored.append((sum(weights[token] for token in tokens), book))
+        scored.sort(key=lambda match: match[0], reverse=True)
+        return [book for score, book in scored[:limit]]
+
+    def similar_authors(self, name, limit=5, threshold=0.4):
+        query = _trigrams(name)
+        if not query:
+            return []
+        need = max(1, math.ceil(threshold * len(query)))
+        rows = self._conn.execute(_SELECT_SIMILAR_AUTHORS, (json.dumps(sorted(query)), need, limit))
+        return [author for author, in rows]
+
+    def titles_starting_with(self, prefix, limit=10):
+        prefix = _normalize(prefix)
+        return list(self._query(_SELECT_TITLE_PREFIX, (prefix, prefix + "\U0010ffff", limit)))
+
+    def export(self, fp, format="csv", available_only=False, author=None):
+        # Rows stream straight from the cursor instead of being fetched at once
+        if author is not None and available_only:
+            cursor = self._conn.execute(_SELECT_AUTHOR_STATUS, (_normalize(author), 0))
+        elif author is not None:
+            cursor = self._conn.execute(_SELECT_AUTHOR, (_normalize(author),))
+        elif available_only:
+            cursor = self._conn.execute(_SELECT_STATUS, (0,))
+        else:
+            cursor = self._conn.execute(_SELECT_ALL)
+        write_books(map(_book, cursor), fp, format)
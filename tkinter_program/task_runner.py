@@ -0,0 +1,97 @@
+# task_runner.py
+#
+# Runs long operations (imports, exports) on worker threads so the Tk event
+# loop keeps running. Tk may only be called from the thread running
+# mainloop, so workers never touch widgets: progress, results and errors
+# are put on a queue that the UI thread drains from an after() callback.
+
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import threading
+
+class TaskCancelled(Exception):
+    pass
+
+class Task:
+    def __init__(self, runner, progress):
+        self._runner = runner
+        self._progress = progress
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        # Takes effect at the task's next check() or report()
+        self._cancel.set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise TaskCancelled("Task cancelled.")
+
+    def report(self, value):
+        # Called by the task function; doubles as a cancellation point
+        self.check()
+        if self._progress is not None:
+            self._runner.call_soon(self._progress, value)
+
+class TaskRunner:
+    MAX_CALLS_PER_POLL = 1000  # keeps a burst of queued calls from freezing the UI
+
+    def __init__(self, root, executor=None, poll_ms=50):
+        self.root = root
+        self.executor = executor or ThreadPoolExecutor(max_workers=2, thread_name_prefix="library-task")
+        self.poll_ms = poll_ms
+        self._calls = queue.SimpleQueue()
+        self._tasks = set()
+        self.root.after(poll_ms, self._poll)
+
+    def submit(self, fn, *args, progress=None, done=None, error=None):
+        # fn(task, *args) runs on a worker thread. On the UI thread,
+        # progress(value) follows each task.report(value), then either
+        # done(result) or error(exception) is called, with TaskCancelled
+        # if the task was cancelled.
+        task = Task(self, progress)
+        self._tasks.add(task)
+        self.executor.submit(self._run, task, fn, args, done, error)
+        return task
+
+    def _run(self, task, fn, args, done, error):
+        try:
+            task.check()
+            result = fn(task, *args)
+            task.check()
+        except Exception as e:
+            self.call_soon(self._finish, task, error, e)
+        else:
+            self.call_soon(self._finish, task, done, result)
+
+    def _finish(self, task, callback, value):
+        self._tasks.discard(task)
+        if callback is not None:
+            callback(value)
+
+    def call_soon(self, fn, *args):
+        # Safe from any thread; fn runs on the UI thread
+        self._calls.put((fn, args))
+
+    def _poll(self):
+        delay = self.poll_ms
+        try:
+            for _ in range(self.MAX_CALLS_PER_POLL):
+                try:
+                    fn, args = self._calls.get_nowait()
+                except queue.Empty:
+                    break
+                fn(*args)
+            else:
+                delay = 1  # more waiting; let Tk handle input first
+        finally:
+            self.root.after(delay, self._poll)
+
+    def close(self):
+        # Cancel running tasks and stop accepting new ones
+        for task in self._tasks:
+            task.cancel()
+        self.executor.shutdown(wait=False)
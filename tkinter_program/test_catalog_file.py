@@ -0,0 +1,77 @@
+# test_catalog_file.py
+#
+# Run from tkinter_program with: python -m unittest (or python -m pytest)
+
+import os
+import tempfile
+import unittest
+
+from book_library import Book, BookNotAvailableError, EBook, Library
+from catalog_file import MappedCatalog, write_catalog
+
+def state(library):
+    return [(str(book), book.is_lent) for book in library.books]
+
+class MappedCatalogTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "catalog.bin")
+        self.library = Library()
+        for i in range(20):
+            if i % 2:
+                self.library.add_book(EBook(f"Title {i}", f"Author {i % 3}", f"isbn-{19 - i:02}", i / 2))
+            else:
+                self.library.add_book(Book(f"Títle {i}", f"Author {i % 3}", f"isbn-{19 - i:02}"))
+        for isbn in ("isbn-00", "isbn-07", "isbn-08", "isbn-19"):
+            self.library.lend_book(isbn)
+        write_catalog(self.library, self.path)
+
+    def test_round_trip(self):
+        with MappedCatalog(self.path) as catalog:
+            self.assertEqual(state(catalog), state(self.library))
+            self.assertEqual(len(catalog), 20)
+            self.assertEqual(sorted(book.isbn for book in catalog.lent()), ["isbn-00", "isbn-07", "isbn-08", "isbn-19"])
+            self.assertEqual(len(catalog.available()), 16)
+            self.assertEqual(catalog.get_book("isbn-08").size, 5.5)
+            self.assertNotIsInstance(catalog.get_book("isbn-07"), EBook)
+            self.assertIsNone(catalog.get_book("isbn-20"))
+            self.assertEqual([book.isbn for book in catalog.books_by_author("author 1")],
+                             [book.isbn for book in self.library.books_by_author("Author 1")])
+
+    def test_empty_catalog(self):
+        write_catalog(Library(), self.path)
+        with MappedCatalog(self.path) as catalog:
+            self.assertEqual(catalog.books, [])
+            self.assertEqual(len(catalog.lent()), 0)
+            self.assertNotIn("isbn-00", catalog)
+
+    def test_lent_bits_persist_when_writable(self):
+        with MappedCatalog(self.path, writable=True) as catalog:
+            catalog.lend_book("isbn-01")
+            catalog.return_book("isbn-19")
+            with self.assertRaises(BookNotAvailableError):
+                catalog.lend_book("isbn-00")
+            with self.assertRaises(BookNotAvailableError):
+                catalog.return_book("isbn-02")
+        with MappedCatalog(self.path) as catalog:
+            self.assertEqual(sorted(book.isbn for book in catalog.lent()), ["isbn-00", "isbn-01", "isbn-07", "isbn-08"])
+            with self.assertRaises(ValueError):
+                catalog.lend_book("isbn-02")
+
+    def test_rewrite_replaces_whole_file(self):
+        self.library.remove_book("isbn-05")
+        self.library.return_book("isbn-00")
+        write_catalog(self.library, self.path)
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["catalog.bin"])
+        with MappedCatalog(self.path) as catalog:
+            self.assertEqual(state(catalog), state(self.library))
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as file:
+            file.write(b"\0" * 128)
+        with self.assertRaises(ValueError):
+            MappedCatalog(self.path)
+
+if __name__ == "__main__":
+    unittest.main()
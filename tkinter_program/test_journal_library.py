@@ -0,0 +1,143 @@
+# test_journal_library.py
+#
+# Run from tkinter_program with: python -m unittest (or python -m pytest)
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from book_library import Book, EBook
+from journal_library import JournaledLibrary
+
+def state(library):
+    return sorted((book.isbn, book.title, book.is_lent) for book in library.books)
+
+class JournaledLibraryTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+
+    def open(self, **options):
+        library = JournaledLibrary(self.directory, **options)
+        self.addCleanup(lambda: library._journal.closed or library.close())
+        return library
+
+    def crash(self, library):
+        # Drop the library without close(). Every record was flushed to the
+        # OS, which is all a process crash keeps, so only stop the fsyncs
+        with library._lock:
+            if library._timer is not None:
+                library._timer.cancel()
+            library._journal.close()
+
+    def journal_path(self, generation):
+        return os.path.join(self.directory, f"journal-{generation}.log")
+
+    def test_replays_every_operation(self):
+        library = self.open()
+        library.add_book(Book("Dune", "Frank Herbert", "1"))
+        library.add_books([EBook("Emma", "Jane Austen", "2", 1.5), Book("Persuasion", "Jane Austen", "3")])
+        library.lend_book("1")
+        library.return_book("1")
+        library.remove_book("3")
+        expected = state(library)
+        self.crash(library)
+        self.assertEqual(state(self.open()), expected)
+
+    def test_replays_lend_many_and_return_many(self):
+        library = self.open()
+        library.add_books([Book(f"Title {i}", "Author", str(i)) for i in range(5)])
+        self.assertFalse(any(library.lend_many(["0", "1", "2", "3"]).values()))
+        self.assertFalse(any(library.return_many(["1", "3"]).values()))
+        # A failed batch changes nothing and writes no record
+        self.assertTrue(any(library.lend_many(["4", "0"]).values()))
+        self.crash(library)
+        recovered = self.open()
+        self.assertEqual(sorted(book.isbn for book in recovered.lent()), ["0", "2"])
+        self.assertEqual(recovered._records, 3)
+
+    def test_truncates_torn_final_record(self):
+        library = self.open()
+        library.add_book(Book("Dune", "Frank Herbert", "1"))
+        library.lend_book("1")
+        self.crash(library)
+        size = os.path.getsize(self.journal_path(0))
+        with open(self.journal_path(0), "a", encoding="utf-8") as journal:
+            journal.write('["add","Emma","Jane Au')
+
+        library = self.open()
+        self.assertEqual(state(library), [("1", "Dune", True)])
+        self.assertEqual(os.path.getsize(self.journal_path(0)), size)
+        # Later records are not glued onto the torn one
+        library.add_book(Book("Emma", "Jane Austen", "2"))
+        self.crash(library)
+        self.assertEqual(state(self.open()), [("1", "Dune", True), ("2", "Emma", False)])
+
+    def test_truncates_complete_but_unterminated_record(self):
+        library = self.open()
+        library.add_book(Book("Dune", "Frank Herbert", "1"))
+        self.crash(library)
+        with open(self.journal_path(0), "a", encoding="utf-8") as journal:
+            journal.write('["lend","1"]')
+        library = self.open()
+        self.assertEqual(state(library), [("1", "Dune", False)])
+        library.lend_book("1")
+        self.crash(library)
+        self.assertEqual(state(self.open()), [("1", "Dune", True)])
+
+    def test_snapshot_rotates_journal(self):
+        library = self.open(snapshot_every=3)
+        library.add_book(Book("Dune", "Frank Herbert", "1"))
+        library.add_book(Book("Emma", "Jane Austen", "2"))
+        library.lend_book("2")  # third record: snapshot
+        self.assertEqual(library.generation, 1)
+        self.assertFalse(os.path.exists(self.journal_path(0)))
+        self.assertEqual(os.path.getsize(self.journal_path(1)), 0)
+        library.return_book("2")
+        library.remove_book("1")
+        expected = state(library)
+        self.crash(library)
+        recovered = self.open(snapshot_every=3)
+        self.assertEqual(recovered.generation, 1)
+        self.assertEqual(state(recovered), expected)
+        self.assertEqual(recovered._records, 2)
+
+    def test_crash_before_snapshot_rename(self):
+        library = self.open()
+        library.add_book(Book("Dune", "Frank Herbert", "1"))
+        library.snapshot()
+        library.lend_book("1")
+        expected = state(library)
+        with mock.patch("journal_library.os.replace", side_effect=OSError("crash")):
+            self.assertRaises(OSError, library.snapshot)
+        self.crash(library)
+        # The old snapshot and journal are still the current ones
+        recovered = self.open()
+        self.assertEqual(recovered.generation, 1)
+        self.assertEqual(state(recovered), expected)
+        recovered.return_book("1")
+        recovered.snapshot()
+        self.assertEqual(state(recovered), [("1", "Dune", False)])
+        self.crash(recovered)
+        self.assertEqual(state(self.open()), [("1", "Dune", False)])
+
+    def test_crash_after_snapshot_rename(self):
+        library = self.open()
+        library.add_book(Book("Dune", "Frank Herbert", "1"))
+        library.lend_book("1")
+        expected = state(library)
+        with mock.patch("journal_library.os.remove", side_effect=OSError("crash")):
+            self.assertRaises(OSError, library.snapshot)
+        self.crash(library)
+        # The new snapshot already holds everything; the old journal is
+        # left behind but not replayed on top of it
+        self.assertTrue(os.path.exists(self.journal_path(0)))
+        recovered = self.open()
+        self.assertEqual(recovered.generation, 1)
+        self.assertEqual(state(recovered), expected)
+        self.assertEqual(recovered._records, 0)
+
+if __name__ == "__main__":
+    unittest.main()
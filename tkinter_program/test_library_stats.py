@@ -0,0 +1,103 @@
+# test_library_stats.py
+#
+# Run from tkinter_program with: python -m unittest (or python -m pytest)
+
+import math
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from book_library import Book, EBook, Library
+from columnar_library import ColumnarLibrary
+
+if np is not None:
+    from library_stats import LibraryStats
+
+def fill(library):
+    library.add_book(Book("Dune", "Frank Herbert", "1"))
+    library.add_book(EBook("Dune Messiah", "Frank  HERBERT", "2", 2.5))
+    library.add_book(EBook("Emma", "Jane Austen", "3", 1.5))
+    library.add_book(Book("Persuasion", "Jane Austen", "4"))
+    library.add_book(EBook("Gone", "Someone Else", "5", 9.0))
+    library.lend_book("2")
+    library.lend_book("5")
+    library.remove_book("5")  # a removed, lent eBook must not count anywhere
+    library.lend_book("4")
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class LibraryStatsTest(unittest.TestCase):
+    def check_aggregates(self, library):
+        fill(library)
+        stats = LibraryStats(library)
+        self.assertEqual(stats.total_books(), 4)
+        self.assertEqual(stats.percent_lent(), 50.0)
+        self.assertEqual(stats.ebook_count(), 2)
+        self.assertEqual(stats.total_ebook_size(), 4.0)
+        self.assertEqual(stats.author_counts(), {"frank herbert": 2, "jane austen": 2})
+        counts, edges = stats.size_histogram(bins=[0, 2, 4])
+        self.assertEqual(counts.tolist(), [1, 1])
+        self.assertEqual(edges.tolist(), [0, 2, 4])
+        counts, edges = stats.size_histogram(bins=np.array([0, 3]))
+        self.assertEqual(counts.tolist(), [2])
+
+        # Cached aggregates follow the library's version
+        library.return_book("4")
+        self.assertEqual(stats.percent_lent(), 25.0)
+        library.add_book(EBook("Sense", "Jane Austen", "6", 4.0))
+        self.assertEqual(stats.total_books(), 5)
+        self.assertEqual(stats.total_ebook_size(), 8.0)
+        self.assertEqual(stats.author_counts()["jane austen"], 3)
+
+    def test_library(self):
+        self.check_aggregates(Library())
+
+    def test_columnar_library(self):
+        self.check_aggregates(ColumnarLibrary())
+
+    def check_empty(self, library):
+        stats = LibraryStats(library)
+        self.assertEqual(stats.total_books(), 0)
+        self.assertEqual(stats.percent_lent(), 0.0)
+        self.assertEqual(stats.ebook_count(), 0)
+        self.assertEqual(stats.total_ebook_size(), 0.0)
+        self.assertEqual(stats.author_counts(), {})
+        counts, edges = stats.size_histogram()
+        self.assertEqual(counts.sum(), 0)
+
+    def test_empty_library(self):
+        self.check_empty(Library())
+
+    def test_empty_columnar_library(self):
+        self.check_empty(ColumnarLibrary())
+
+    def test_columnar_library_with_every_row_removed(self):
+        library = ColumnarLibrary()
+        library.add_book(EBook("Emma", "Jane Austen", "1", 1.5))
+        library.remove_book("1")
+        self.check_empty(library)
+
+    def test_columnar_matches_library(self):
+        libraries = Library(), ColumnarLibrary()
+        for library in libraries:
+            for i in range(50):
+                if i % 3:
+                    library.add_book(EBook(f"Title {i}", f"Author {i % 7}", str(i), i / 4))
+                else:
+                    library.add_book(Book(f"Title {i}", f"Author {i % 7}", str(i)))
+            for i in range(0, 50, 4):
+                library.lend_book(str(i))
+            for i in range(0, 50, 5):
+                library.remove_book(str(i))
+        expected, actual = (LibraryStats(library) for library in libraries)
+        self.assertEqual(actual.total_books(), expected.total_books())
+        self.assertEqual(actual.percent_lent(), expected.percent_lent())
+        self.assertEqual(actual.ebook_count(), expected.ebook_count())
+        self.assertTrue(math.isclose(actual.total_ebook_size(), expected.total_ebook_size()))
+        self.assertEqual(actual.author_counts(), expected.author_counts())
+        self.assertEqual(actual.size_histogram()[0].tolist(), expected.size_histogram()[0].tolist())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,29 @@
+import argparse
+import os
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
-from book_library import Book, EBook, Library, BookNotAvailableError
+from tkinter import ttk, messagebox, simpledialog, filedialog
+from book_library import Book, EBook, BookNotAvailableError, write_books
+from concurrent_library import ConcurrentLibrary
+from importer import import_books
+from task_runner import TaskCancelled, TaskRunner
+from tree_sync import TreeviewSync
+from virtual_tree import VirtualBookList
 
 class LibraryApp:
-    def __init__(self, root):
-        self.library = Library()
+    def __init__(self, root, virtual=False):
+        self.virtual = virtual  # materialize only the visible rows, for huge catalogs
+        # Imports and exports run on worker threads, so the library is the
+        # thread-safe one. Its events are always queued for the UI thread,
+        # even when raised there, so row updates never run inside a mutation.
+        self.library = ConcurrentLibrary()
+        self.tasks = TaskRunner(root)
+        self.task = None  # the running background task, if any
+        self.library.subscribe(lambda event, book: self.tasks.call_soon(self.on_library_event, event, book))
         self.search_highlight_tag = "highlight"
+        self.highlighted = set()  # ISBNs of the rows carrying the highlight tag
 
         self.root = root
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
         self.root.title("Library Management System")
         self.root.geometry("900x750")
         self.root.configure(bg="#f5f5f5")
@@ -34,6 +50,7 @@ class LibraryApp:
         self.create_entry_frame()
         self.create_button_frame()
         self.create_inventory_frame()
+        self.create_status_frame()
 
     def create_entry_frame(self):
         entry_frame = ttk.LabelFrame(self.main_frame, text="Add New Book", padding=10)
@@ -72,11 +89,15 @@ class LibraryApp:
             ("Return Book", self.return_book),
             ("Remove Book", self.remove_book),
             ("View by Author", self.view_books_by_author),
-            ("Clear Highlight", self.clear_highlight)
+            ("Clear Highlight", self.clear_highlight),
+            ("Import File", self.import_file),
+            ("Export File", self.export_file)
         ]
 
+        self.buttons = {}
         for i, (text, command) in enumerate(buttons):
-            ttk.Button(button_frame, text=text, command=command, width=15).grid(row=0, column=i, padx=5, pady=5)
+            self.buttons[text] = ttk.Button(button_frame, text=text, command=command, width=15)
+            self.buttons[text].grid(row=0, column=i, padx=5, pady=5)
 
         button_frame.columnconfigure(tuple(range(len(buttons))), weight=1)
 
@@ -100,17 +121,33 @@ class LibraryApp:
 
         self.tree.tag_configure(self.search_highlight_tag, background='yellow')
 
-        y_scroll = ttk.Scrollbar(inventory_frame, orient="vertical", command=self.tree.yview)
+        y_scroll = ttk.Scrollbar(inventory_frame, orient="vertical")
         y_scroll.pack(side="right", fill="y")
         x_scroll = ttk.Scrollbar(inventory_frame, orient="horizontal", command=self.tree.xview)
         x_scroll.pack(side="bottom", fill="x")
 
-        self.tree.configure(yscrollcommand=y_scroll.set, xscrollcommand=x_scroll.set)
+        self.tree.configure(xscrollcommand=x_scroll.set)
+        if self.virtual:
+            # The window drives the vertical scrollbar over the whole catalog
+            self.window = VirtualBookList(self.tree, y_scroll, self.library, self.row_values, self.row_tags)
+        else:
+            self.window = None
+            self.rows = TreeviewSync(self.tree)  # ISBN-keyed rows
+            y_scroll.configure(command=self.tree.yview)
+            self.tree.configure(yscrollcommand=y_scroll.set)
         self.tree.pack(fill=tk.BOTH, expand=True)
 
         self.main_frame.columnconfigure(0, weight=1)
         self.main_frame.rowconfigure(2, weight=1)
 
+    def create_status_frame(self):
+        status_frame = ttk.Frame(self.main_frame)
+        status_frame.grid(row=3, column=0, sticky="ew")
+        self.status_var = tk.StringVar()
+        ttk.Label(status_frame, textvariable=self.status_var).pack(side="left", padx=5)
+        self.cancel_button = ttk.Button(status_frame, text="Cancel", command=self.cancel_task, state='disabled')
+        self.cancel_button.pack(side="right", padx=5)
+
     def toggle_ebook_field(self):
         if self.ebook_var.get():
             self.size_entry.config(state='normal')
@@ -141,7 +178,7 @@ class LibraryApp:
             messagebox.showerror("Error", "Title, Author, and ISBN are required.")
             return
 
-        if any(book.isbn == isbn for book in self.library.books):
+        if isbn in self.library:
             messagebox.showerror("Error", "A book with this ISBN already exists.")
             return
 
@@ -162,7 +199,6 @@ class LibraryApp:
                 book = Book(title, author, isbn)
 
             self.library.add_book(book)
-            self.update_book_list()
             messagebox.showinfo("Success", f"Book '{title}' added.")
             self.clear_fields()
 
@@ -170,37 +206,55 @@ class LibraryApp:
             messagebox.showerror("Error", f"Failed to add book: {str(e)}")
 
     def lend_book(self):
-        available_books = [book for book in self.library.books if not book.is_lent]
+        available_books = self.library.available()
         if not available_books:
             messagebox.showinfo("Info", "No available books to lend.")
             return
 
         book_list = "\n".join(f"{book.title} ({book.isbn})" for book in available_books)
-        isbn = simpledialog.askstring("Lend Book", f"Available Books:\n{book_list}\n\nEnter ISBN to lend:")
+        isbn = simpledialog.askstring("Lend Book", f"Available Books:\n{book_list}\n\nEnter ISBN to lend (separate several with commas):")
         if isbn:
+            isbns = [part.strip() for part in isbn.split(",") if part.strip()]
+            if not isbns:
+                return
+            if len(isbns) > 1:
+                self.circulate_many(self.library.lend_many, isbns, "lent")
+                return
             try:
-                self.library.lend_book(isbn)
+                self.library.lend_book(isbns[0])
                 messagebox.showinfo("Success", "Book lent.")
-                self.update_book_list()
             except BookNotAvailableError as e:
                 messagebox.showerror("Error", str(e))
 
     def return_book(self):
-        lent_books = [book for book in self.library.books if book.is_lent]
+        lent_books = self.library.lent()
         if not lent_books:
             messagebox.showinfo("Info", "No books to return.")
             return
 
         book_list = "\n".join(f"{book.title} ({book.isbn})" for book in lent_books)
-        isbn = simpledialog.askstring("Return Book", f"Lent Books:\n{book_list}\n\nEnter ISBN to return:")
+        isbn = simpledialog.askstring("Return Book", f"Lent Books:\n{book_list}\n\nEnter ISBN to return (separate several with commas):")
         if isbn:
+            isbns = [part.strip() for part in isbn.split(",") if part.strip()]
+            if not isbns:
+                return
+            if len(isbns) > 1:
+                self.circulate_many(self.library.return_many, isbns, "returned")
+                return
             try:
-                self.library.return_book(isbn)
+                self.library.return_book(isbns[0])
                 messagebox.showinfo("Success", "Book returned.")
-                self.update_book_list()
             except BookNotAvailableError as e:
                 messagebox.showerror("Error", str(e))
 
+    def circulate_many(self, operation, isbns, done):
+        results = operation(isbns)
+        errors = [f"{isbn}: {error}" for isbn, error in results.items() if error]
+        if errors:
+            messagebox.showerror("Error", "No books were {}:\n{}".format(done, "\n".join(errors)))
+        else:
+            messagebox.showinfo("Success", f"{len(results)} books {done}.")
+
     def remove_book(self):
         isbn = simpledialog.askstring("Remove Book", "Enter ISBN:")
         if isbn:
@@ -209,36 +263,157 @@ class LibraryApp:
                 try:
                     self.library.remove_book(isbn)
                     messagebox.showinfo("Removed", "Book removed.")
-                    self.update_book_list()
                 except Exception as e:
                     messagebox.showerror("Error", f"Failed to remove book: {str(e)}")
 
+    def start_task(self, label, fn, *args, done, failed):
+        # Run fn(task, *args) in the background, one task at a time; the
+        # status bar shows its progress until done or failed is called
+        def finish(callback):
+            def call(value):
+                self.task = None
+                self.status_var.set("")
+                self.cancel_button.config(state='disabled')
+                for text in ("Import File", "Export File"):
+                    self.buttons[text].config(state='normal')
+                callback(value)
+            return call
+
+        for text in ("Import File", "Export File"):
+            self.buttons[text].config(state='disabled')
+        self.cancel_button.config(state='normal')
+        self.status_var.set(f"{label}...")
+        self.task = self.tasks.submit(fn, *args, progress=lambda rows: self.status_var.set(f"{label}... {rows:,} rows"),
+                                      done=finish(done), error=finish(failed))
+
+    def cancel_task(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.status_var.set("Cancelling...")
+
+    def close(self):
+        self.tasks.close()
+        self.root.destroy()
+
+    def import_file(self):
+        path = filedialog.askopenfilename(title="Import Books", filetypes=[("CSV or JSON Lines", "*.csv *.jsonl"), ("All files", "*.*")])
+        if path:
+            def imported(report):
+                message = str(report)
+                if report.errors:
+                    message += "\n\n" + "\n".join(f"Line {line}: {error}" for line, error in report.errors[:10])
+                messagebox.showinfo("Import", message)
+
+            def failed(e):
+                if isinstance(e, TaskCancelled):
+                    messagebox.showinfo("Import", "Import cancelled. Books read before that were kept.")
+                else:
+                    messagebox.showerror("Error", f"Failed to import books: {str(e)}")
+
+            # report() after each batch also stops the import once cancelled
+            self.start_task("Importing", lambda task: import_books(self.library, path, progress=task.report),
+                            done=imported, failed=failed)
+
+    def export_file(self):
+        path = filedialog.asksaveasfilename(title="Export Books", defaultextension=".csv", filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")])
+        if path:
+            format = "jsonl" if path.lower().endswith(".jsonl") else "csv"
+
+            def export(task):
+                # Page by page, so lending and scrolling are not held up
+                # for the whole export
+                exported = 0
+                def books():
+                    nonlocal exported
+                    cursor = None
+                    while True:
+                        page, cursor = self.library.page(cursor, 1000)
+                        yield from page
+                        exported += len(page)
+                        task.report(exported)
+                        if cursor is None:
+                            return
+                try:
+                    with open(path, "w", newline="", encoding="utf-8") as fp:
+                        write_books(books(), fp, format)
+                except TaskCancelled:
+                    os.remove(path)
+                    raise
+                return exported
+
+            def failed(e):
+                if isinstance(e, TaskCancelled):
+                    messagebox.showinfo("Export", "Export cancelled.")
+                else:
+                    messagebox.showerror("Error", f"Failed to export books: {str(e)}")
+
+            self.start_task("Exporting", export,
+                            done=lambda exported: messagebox.showinfo("Export", f"Exported {exported} books."), failed=failed)
+
     def view_books_by_author(self):
         author = simpledialog.askstring("Search", "Enter author's name:")
         if author:
             self.clear_highlight()
             books = list(self.library.books_by_author(author))
             if books:
-                for item in self.tree.get_children():
-                    values = self.tree.item(item, 'values')
-                    if values and values[1].strip().lower() == author.strip().lower():
-                        self.tree.item(item, tags=(self.search_highlight_tag,))
+                if self.window is not None:
+                    self.highlighted.update(book.isbn for book in books)
+                    self.window.render()
+                else:
+                    # Tag just the author's rows, found through the ISBN -> item map
+                    for book in books:
+                        item = self.rows.items.get(book.isbn)
+                        if item is not None:
+                            self.tree.item(item, tags=(self.search_highlight_tag,))
+                            self.highlighted.add(book.isbn)
                 messagebox.showinfo("Search Results", f"Found {len(books)} books by {author}")
             else:
-                messagebox.showinfo("Not Found", "No books by this author.")
+                message = "No books by this author."
+                suggestions = self.library.similar_authors(author)
+                if suggestions:
+                    message += "\n\nDid you mean: " + ", ".join(suggestions) + "?"
+                messagebox.showinfo("Not Found", message)
 
     def clear_highlight(self):
-        for item in self.tree.get_children():
-            self.tree.item(item, tags=())
+        if self.window is not None:
+            self.highlighted.clear()
+            self.window.render()
+            return
+        for isbn in self.highlighted:
+            item = self.rows.items.get(isbn)
+            if item is not None:
+                self.tree.item(item, tags=())
+        self.highlighted.clear()
+
+    def row_values(self, book):
+        status = "Lent" if book.is_lent else "Available"
+        size = f"{book.size:.2f}" if isinstance(book, EBook) else ""
+        return (book.title, book.author, book.isbn, status, size)
+
+    def row_tags(self, book):
+        return (self.search_highlight_tag,) if book.isbn in self.highlighted else ()
+
+    def on_library_event(self, event, book):
+        # Patch only the affected row instead of rebuilding the tree
+        if event == "removed":
+            self.highlighted.discard(book.isbn)
+        if self.window is not None:
+            self.window.on_library_event(event, book)
+        elif event == "removed":
+            self.rows.discard(book.isbn)
+        else:
+            self.rows.set(book.isbn, self.row_values(book))
 
     def update_book_list(self):
-        self.tree.delete(*self.tree.get_children())
-        for book in self.library.books:
-            status = "Lent" if book.is_lent else "Available"
-            size = f"{book.size:.2f}" if isinstance(book, EBook) else ""
-            self.tree.insert("", "end", values=(book.title, book.author, book.isbn, status, size))
+        if self.window is not None:
+            self.window.refresh()
+            return
+        self.rows.reconcile((book.isbn, self.row_values(book)) for book in self.library.books)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Library Management System")
+    parser.add_argument("--virtual", action="store_true", help="virtual scrolling, for catalogs of millions of books")
+    args = parser.parse_args()
     root = tk.Tk()
-    app = LibraryApp(root)
+    app = LibraryApp(root, args.virtual)
     root.mainloop()
@@ -0,0 +1,42 @@
+# tree_sync.py
+#
+# Keyed reconciliation for a ttk.Treeview. Each row is identified by a key
+# (the ISBN) and the values last written to it are remembered, so bringing
+# the tree up to date costs one Tcl call per row that actually changed
+# rather than deleting and re-inserting every row.
+
+class TreeviewSync:
+    def __init__(self, tree):
+        self.tree = tree
+        self.items = {}  # key -> Treeview item id
+        self._values = {}  # key -> values last written to the row
+
+    def set(self, key, values):
+        # Insert the row, or update it if its values changed
+        item = self.items.get(key)
+        if item is None:
+            self.items[key] = self.tree.insert("", "end", values=values)
+        elif self._values[key] != values:
+            self.tree.item(item, values=values)
+        else:
+            return
+        self._values[key] = values
+
+    def discard(self, key):
+        item = self.items.pop(key, None)
+        if item is not None:
+            del self._values[key]
+            self.tree.delete(item)
+
+    def reconcile(self, rows):
+        # Make the tree show exactly `rows`, an iterable of (key, values).
+        # New keys are appended, so rows keep the order they were added in.
+        seen = set()
+        for key, values in rows:
+            seen.add(key)
+            self.set(key, values)
+        stale = [key for key in self.items if key not in seen]
+        if stale:
+            for key in stale:
+                del self._values[key]
+            self.tree.delete(*(self.items.pop(key) for key in stale))
@@ -0,0 +1,127 @@
+# virtual_tree.py
+#
+# Virtual scrolling for a ttk.Treeview over a whole Library. The tree only
+# ever holds as many items as fit on screen; scrolling rewrites their values
+# from a cached slice of the catalog (the visible rows plus `overscan` rows
+# either side), and the scrollbar is driven by the row offset into the full
+# catalog rather than by the tree itself.
+#
+# Row offsets are turned into Library.page cursors through anchors taken
+# every STRIDE rows, so jumping anywhere costs at most one STRIDE-sized page
+# once the anchors up to that point exist.
+
+class VirtualBookList:
+    STRIDE = 1000
+
+    def __init__(self, tree, scrollbar, library, row_values, tags=lambda book: (), overscan=100):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.library = library
+        self.row_values = row_values
+        self.tags = tags
+        self.overscan = overscan
+        self.first = 0  # catalog offset of the top row
+        self._total = 0  # catalog size at the last render
+        self.visible = int(tree.cget("height"))
+        self._anchors = [None]  # _anchors[j]: page cursor just before row j * STRIDE
+        self._cache_start = 0
+        self._cache = []  # books at offsets _cache_start, _cache_start + 1, ...
+        self._slots = []  # [item id, values, tags] for each tree item, top to bottom
+        self._render_pending = False  # an after_idle render is scheduled
+
+        scrollbar.configure(command=self.yview)
+        tree.bind("<Configure>", self._on_configure)
+        tree.bind("<MouseWheel>", lambda event: self._wheel(-1 if event.delta > 0 else 1))
+        tree.bind("<Button-4>", lambda event: self._wheel(-1))
+        tree.bind("<Button-5>", lambda event: self._wheel(1))
+
+    def _cursor(self, offset):
+        # Page cursor for the book at `offset`, plus how many rows after it to skip
+        j = offset // self.STRIDE
+        while len(self._anchors) <= j:
+            books, cursor = self.library.page(self._anchors[-1], self.STRIDE)
+            if cursor is None:
+                j = len(self._anchors) - 1
+                break
+            self._anchors.append(cursor)
+        return self._anchors[j], offset - j * self.STRIDE
+
+    def _fetch(self, start, count):
+        cursor, skip = self._cursor(start)
+        books, _ = self.library.page(cursor, skip + count)
+        self._cache_start = start
+        self._cache = books[skip:]
+
+    def refresh(self):
+        # The catalog changed in ways the cache cannot follow
+        self._anchors = [None]
+        self._cache = []
+        self.render()
+
+    def render(self):
+        total = self._total = len(self.library)
+        self.first = max(0, min(self.first, total - self.visible))
+        count = min(self.visible, total)
+        end = self.first + count
+        if self.first < self._cache_start or end > self._cache_start + len(self._cache):
+            start = max(0, self.first - self.overscan)
+            self._fetch(start, end - start + self.overscan)
+        rows = self._cache[self.first - self._cache_start:end - self._cache_start]
+
+        while len(self._slots) > len(rows):
+            self.tree.delete(self._slots.pop()[0])
+        while len(self._slots) < len(rows):
+            self._slots.append([self.tree.insert("", "end"), None, None])
+        for slot, book in zip(self._slots, rows):
+            values, tags = self.row_values(book), self.tags(book)
+            if slot[1] != values or slot[2] != tags:
+                self.tree.item(slot[0], values=values, tags=tags)
+                slot[1], slot[2] = values, tags
+
+        if total:
+            self.scrollbar.set(self.first / total, end / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def on_library_event(self, event, book):
+        # Events come in bursts (one per book of an import batch, drained
+        # from the TaskRunner queue together), so they only update state
+        # here; the window is rendered once, when Tk goes idle after the drain
+        if event == "removed":
+            # Every later row moves up one, anchors included
+            self._anchors = [None]
+            self._cache = []
+        # Events may arrive queued, after several more books were added.
+        # New books go at the end, past the cached offsets, so the cache
+        # stays valid; render fetches them if they come into view.
+        elif event == "added" and self.first + self.visible >= self._total:
+            self.first = len(self.library)  # stay at the bottom; render clamps
+        if not self._render_pending:
+            self._render_pending = True
+            self.tree.after_idle(self._render_idle)
+
+    def _render_idle(self):
+        self._render_pending = False
+        self.render()
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * len(self.library))
+        elif args[0] == "scroll":
+            step = self.visible if args[2] == "pages" else 1
+            self.first += int(args[1]) * step
+        self.render()
+
+    def _wheel(self, units):
+        self.yview("scroll", units * 3, "units")
+        return "break"
+
+    def _on_configure(self, event):
+        # Fit as many rows as the widget has room for, measured from a shown row
+        if self._slots:
+            bbox = self.tree.bbox(self._slots[0][0])
+            if bbox:
+                visible = max(1, (event.height - bbox[1]) // bbox[3])
+                if visible != self.visible:
+                    self.visible = visible
+                    self.render()